@@ -0,0 +1,100 @@
+# Compares the per-call OCR latency of the pytesseract subprocess backend with the
+# in-process tesserocr backend on the same dialog images.
+#
+# Usage (from the LOTRO To Speech root folder):
+#   python Benchmarks/benchmarkOcrBackends.py "path/to/dialog images" [--lang eng] [--psm 6] [--repeat N]
+#       [--tesseract "C:\Program Files\Tesseract-OCR\tesseract.exe"]
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytesseract
+import ocrBackend
+import screenCapture
+
+
+def load_images(directory):
+    source = screenCapture.FileReplayCapture(directory, loop=False, preload=True)
+    images = []
+
+    while True:
+        frame = source.grab()
+
+        if frame is None:
+            return images
+
+        images.append((os.path.basename(source.current_path), frame.crop_rgb(0, 0, frame.width, frame.height)))
+
+
+def run(backend, images, lang, psm, repeat):
+    timings = []
+    texts = {}
+
+    # Erster Aufruf lädt die Sprache, zählt nicht zur Messung
+    backend.image_to_string(images[0][1], lang, psm)
+
+    for name, image in images:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            texts[name] = backend.image_to_string(image, lang, psm)
+            timings.append((time.perf_counter() - start) * 1000)
+
+    return timings, texts
+
+
+def summary(timings):
+    ordered = sorted(timings)
+    p95 = ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))]
+
+    return f"median {statistics.median(ordered):8.1f} ms   p95 {p95:8.1f} ms"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OCR backend benchmark")
+    parser.add_argument("images", help="Folder with cropped dialog images (PNG/JPG)")
+    parser.add_argument("--lang", default="eng")
+    parser.add_argument("--psm", type=int, default=None)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--tesseract", default=None, help="Path to tesseract(.exe)")
+    args = parser.parse_args()
+
+    if args.tesseract:
+        pytesseract.pytesseract.tesseract_cmd = args.tesseract
+
+    images = load_images(args.images)
+
+    backends = [ocrBackend.PytesseractBackend()]
+
+    if ocrBackend.tesserocr is not None:
+        backends.append(ocrBackend.TesserocrBackend())
+    else:
+        print("tesserocr is not installed, only pytesseract is measured.")
+
+    results = {}
+
+    for backend in backends:
+        timings, texts = run(backend, images, args.lang, args.psm, args.repeat)
+        results[backend.name] = (timings, texts)
+        print(f"{backend.name:<12} {summary(timings)}")
+
+    if len(results) == 2:
+        reference = results["pytesseract"][1]
+        other = results["tesserocr"][1]
+        different = [name for name in reference if reference[name].strip() != other[name].strip()]
+
+        speedup = statistics.median(results["pytesseract"][0]) / max(statistics.median(results["tesserocr"][0]), 1e-6)
+
+        print(f"tesserocr is {speedup:.1f}x faster per call")
+        print(f"Images with different text: {len(different)} of {len(images)}")
+
+        for name in different:
+            print(f"  {name}")
+
+
+if __name__ == "__main__":
+    main()
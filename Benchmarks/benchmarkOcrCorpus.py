@@ -0,0 +1,293 @@
+# Runs the legacy OCR path (OCRDetectionAndCleanup.detect_and_read) and the V2 engine (run_ocr)
+# headlessly on a corpus of LOTRO dialog screenshots with known text, and reports the character
+# error rate and the median / p95 milliseconds per stage (detect, crop, binarize, tesseract, clean).
+# The results are written as JSON, so two runs (e.g. before and after an OCR change) can be compared.
+#
+# Usage (from the LOTRO To Speech root folder):
+#   python Benchmarks/benchmarkOcrCorpus.py [--corpus Benchmarks/ocrCorpus] [--output results.json]
+#       [--compare previous.json] [--pipeline legacy|v2] [--repeat N]
+#       [--tesseract "C:\Program Files\Tesseract-OCR\tesseract.exe"]
+#
+# Corpus layout: full, unscaled screenshots of the game window, e.g. en/, de/, fr/ subfolders,
+# described by manifest.json in the corpus folder:
+#   {"samples": [{"image": "en/quest_0001.png",      screenshot, relative to the corpus folder
+#                 "text": "en/quest_0001.txt",       ground truth (UTF-8, the text as the player sees it)
+#                 "lang": "eng",                     Tesseract language (eng, deu, fra)
+#                 "ocr_area": [x1, y1, x2, y2]}]}    OCR area of the legacy path (as set with the hotkey)
+
+import argparse
+import json
+import os
+import platform
+import re
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(1, os.path.join(ROOT_DIR, "V2"))
+
+import pytesseract
+import ocrCache
+import screenCapture
+from screenFrame import Frame
+
+stages = ("detect", "crop", "binarize", "tesseract", "clean")
+
+# V2 splits the dialog search into several steps, they all count as "detect".
+v2_stage_names = {"track": "detect", "mask": "detect", "dilate": "detect", "contours": "detect",
+                  "crop": "crop", "binarize": "binarize", "tesseract": "tesseract", "clean": "clean"}
+
+
+class SampleCapture:
+    """ Capture source that always returns the screenshot of the current sample. """
+
+    def __init__(self):
+        self.frame = None
+
+    def grab(self, monitor_index=None):
+        return self.frame
+
+    def close(self):
+        pass
+
+
+def load_corpus(corpus):
+    with open(os.path.join(corpus, "manifest.json"), "r", encoding="utf-8") as file:
+        manifest = json.load(file)
+
+    samples = []
+
+    for entry in manifest.get("samples", []):
+        with open(os.path.join(corpus, entry["text"]), "r", encoding="utf-8") as file:
+            truth = file.read()
+
+        samples.append({
+            "name": entry["image"],
+            "lang": entry.get("lang", "eng"),
+            "ocr_area": entry["ocr_area"],
+            "truth": truth,
+            "image": screenCapture.FileReplayCapture.read(os.path.join(corpus, entry["image"])),
+        })
+
+    return samples
+
+
+def normalize(text):
+    return re.sub(r"\s+", " ", text or "").strip()
+
+
+def edit_distance(a, b):
+    previous = list(range(len(b) + 1))
+
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+
+        previous = current
+
+    return previous[-1]
+
+
+def character_error_rate(recognized, truth):
+    recognized, truth = normalize(recognized), normalize(truth)
+
+    return edit_distance(recognized, truth) / max(1, len(truth))
+
+
+disabled_caches = []
+
+
+def disabled_ocr_cache(directory):
+    # Capacity 0: every lookup misses, so Tesseract runs for every sample and repetition
+    cache = ocrCache.OcrCache(os.path.join(directory, "ocr_cache.json"), capacity=0)
+    disabled_caches.append(cache)
+
+    return cache
+
+
+def run_legacy(samples, repeat, cache_directory):
+    import globalVariables
+    import OCRDetectionAndCleanup
+
+    OCRDetectionAndCleanup.ocr_cache = disabled_ocr_cache(cache_directory)
+
+    results = []
+
+    for sample in samples:
+        frame = Frame(sample["image"], "BGR")
+        start_x, start_y, end_x, end_y = sample["ocr_area"]
+
+        for _ in range(repeat):
+            globalVariables.text_ocr = ""
+            OCRDetectionAndCleanup.detect_and_read(frame, start_x, start_y, end_x, end_y, sample["lang"])
+            timings = dict(OCRDetectionAndCleanup.last_timings)
+
+            results.append((sample, globalVariables.text_ocr, timings))
+
+    return results
+
+
+def run_v2(samples, repeat, cache_directory, tesseract_cmd):
+    # V2 keeps config.json, app.log and its caches in the working directory
+    previous_directory = os.getcwd()
+    os.chdir(cache_directory)
+
+    try:
+        from engine import VoiceEngine
+
+        engine = VoiceEngine()
+        engine.ocr_cache = disabled_ocr_cache(cache_directory)
+        pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
+
+        source = SampleCapture()
+        screenCapture.set_capture_source(source)
+
+        results = []
+
+        for sample in samples:
+            source.frame = Frame(sample["image"], "BGR")
+
+            # Read with the language of the sample, like the legacy run. The session detection
+            # would otherwise settle on one language and depend on the order of the samples
+            engine.config["ocr_languages"] = sample["lang"]
+            engine.language_detector.language = sample["lang"]
+
+            for _ in range(repeat):
+                # Every sample is measured on its own: no dialog tracking, no scroll reuse
+                engine.last_dialog_rect = None
+                engine.last_ocr_image = None
+
+                text = engine.run_ocr()
+
+                timings = {}
+                for name, seconds in engine.last_timings.items():
+                    stage = v2_stage_names.get(name, name)
+                    timings[stage] = timings.get(stage, 0.0) + seconds
+
+                results.append((sample, text, timings))
+
+        return results
+    finally:
+        os.chdir(previous_directory)
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def summarize(results):
+    per_sample = {}
+    stage_values = {stage: [] for stage in stages}
+    totals = []
+
+    for sample, text, timings in results:
+        per_sample[sample["name"]] = {"lang": sample["lang"], "text": text,
+                                      "cer": character_error_rate(text, sample["truth"])}
+
+        for stage in stages:
+            if stage in timings:
+                stage_values[stage].append(timings[stage] * 1000)
+
+        totals.append(sum(timings.values()) * 1000)
+
+    languages = {}
+    for entry in per_sample.values():
+        languages.setdefault(entry["lang"], []).append(entry["cer"])
+
+    return {
+        "cer": statistics.mean(entry["cer"] for entry in per_sample.values()),
+        "cer_by_lang": {lang: statistics.mean(values) for lang, values in languages.items()},
+        "stages_ms": {stage: {"p50": statistics.median(values), "p95": percentile(values, 0.95)}
+                      for stage, values in stage_values.items() if values},
+        "total_ms": {"p50": statistics.median(totals), "p95": percentile(totals, 0.95)},
+        "samples": per_sample,
+    }
+
+
+def print_summary(name, summary, previous=None):
+    def delta(value, old):
+        return f" ({value - old:+.1f})" if old is not None else ""
+
+    old_cer = previous["cer"] if previous else None
+    print(f"{name}: CER {summary['cer'] * 100:.2f} %"
+          + (f" ({(summary['cer'] - old_cer) * 100:+.2f})" if old_cer is not None else ""))
+
+    for lang, cer in sorted(summary["cer_by_lang"].items()):
+        print(f"  {lang}: CER {cer * 100:.2f} %")
+
+    for stage, values in list(summary["stages_ms"].items()) + [("total", summary["total_ms"])]:
+        if previous is None:
+            old = {}
+        elif stage == "total":
+            old = previous["total_ms"]
+        else:
+            old = previous["stages_ms"].get(stage, {})
+
+        print(f"  {stage:<10} p50 {values['p50']:8.1f} ms{delta(values['p50'], old.get('p50'))}"
+              f"   p95 {values['p95']:8.1f} ms{delta(values['p95'], old.get('p95'))}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OCR accuracy and latency benchmark")
+    parser.add_argument("--corpus", default=os.path.join(ROOT_DIR, "Benchmarks", "ocrCorpus"))
+    parser.add_argument("--output", default="ocr_benchmark.json", help="JSON file for the results")
+    parser.add_argument("--compare", default=None, help="Results of an earlier run to compare with")
+    parser.add_argument("--pipeline", choices=("legacy", "v2"), action="append",
+                        help="Only run this pipeline (default: both)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--tesseract", default=pytesseract.pytesseract.tesseract_cmd, help="Path to tesseract(.exe)")
+    args = parser.parse_args()
+
+    pytesseract.pytesseract.tesseract_cmd = args.tesseract
+
+    samples = load_corpus(args.corpus)
+
+    if not samples:
+        sys.exit(f"No samples in {os.path.join(args.corpus, 'manifest.json')}")
+
+    previous = None
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as file:
+            previous = json.load(file)
+
+    output = {
+        "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "machine": platform.platform(),
+        "tesseract": str(pytesseract.get_tesseract_version()),
+        "samples": len(samples),
+        "repeat": args.repeat,
+        "pipelines": {},
+    }
+
+    with tempfile.TemporaryDirectory() as cache_directory:
+        for pipeline in args.pipeline or ("legacy", "v2"):
+            if pipeline == "legacy":
+                results = run_legacy(samples, args.repeat, cache_directory)
+            else:
+                results = run_v2(samples, args.repeat, cache_directory, args.tesseract)
+
+            summary = summarize(results)
+            output["pipelines"][pipeline] = summary
+
+            print_summary(pipeline, summary, previous["pipelines"].get(pipeline) if previous else None)
+
+        # Write now, not at exit when the temporary folder is already gone
+        for cache in disabled_caches:
+            cache.save()
+
+    with open(args.output, "w", encoding="utf-8") as file:
+        json.dump(output, file, indent=2, ensure_ascii=False)
+
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+# Compares the legacy quest window detection (full resolution BGR matchTemplate for every
+# template) with the coarse-to-fine pyramid matcher on recorded screenshots.
+#
+# Usage (from the LOTRO To Speech root folder):
+#   python Benchmarks/benchmarkTemplateMatching.py "path/to/screenshots" [--templates DIR] [--repeat N]
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cv2
+import detectionTemplates
+import pyramidMatcher
+import screenCapture
+
+match_threshold = 0.7
+
+
+def legacy_is_image_on_screen(screenshot_bgr, templates):
+    # Same work as the old is_image_on_screen(), minus the screenshot per template.
+    for template in templates:
+        result = cv2.matchTemplate(screenshot_bgr, template.bgr, cv2.TM_CCOEFF_NORMED)
+        min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(result)
+
+        if max_val > match_threshold:
+            return True
+
+    return False
+
+
+def pyramid_is_image_on_screen(screenshot_bgr, templates, calibrate=False):
+    gray = cv2.cvtColor(screenshot_bgr, cv2.COLOR_BGR2GRAY)
+    screen_pyramid = pyramidMatcher.build_pyramid(gray, pyramidMatcher.max_levels)
+
+    scale = pyramidMatcher.calibrated_scale or 1.0
+
+    for template in templates:
+        max_val, max_loc = pyramidMatcher.match(screen_pyramid, pyramidMatcher.template_pyramid(template, scale))
+
+        if max_val > match_threshold:
+            if pyramidMatcher.calibrated_scale is None:
+                pyramidMatcher.set_calibrated_scale(scale)
+            return True
+
+    if calibrate:
+        # No throttling here, every screenshot gets its calibration attempt.
+        pyramidMatcher._last_calibration = 0.0
+        return pyramidMatcher.calibrate(screen_pyramid, templates, match_threshold) is not None
+
+    return False
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, (time.perf_counter() - start) * 1000
+
+
+def load_screenshots(directory):
+    source = screenCapture.FileReplayCapture(directory, loop=False, preload=True)
+    screenshots = []
+
+    while True:
+        frame = source.grab()
+
+        if frame is None:
+            return screenshots
+
+        screenshots.append((os.path.basename(source.current_path), frame.bgr))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Template matching benchmark")
+    parser.add_argument("screenshots", help="Folder with recorded full screen screenshots (PNG/JPG)")
+    parser.add_argument("--templates", default=detectionTemplates.default_image_directory,
+                        help="Folder with the detection images")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    detectionTemplates.default_image_directory = args.templates
+    detectionTemplates.globalVariables.image_detection_path = args.templates
+    templates = detectionTemplates.get_templates()
+
+    screenshots = load_screenshots(args.screenshots)
+
+    if not templates or not screenshots:
+        print("No templates or screenshots found.")
+        return
+
+    legacy_times = []
+    pyramid_times = []
+    disagreements = 0
+
+    print(f"{'Screenshot':<40} {'legacy':>8} {'ms':>9} {'pyramid':>8} {'ms':>9}")
+
+    for name, screenshot in screenshots:
+        # Warm-up run: lets the pyramid matcher calibrate the UI scale for this screenshot,
+        # the timed runs below then measure the steady state with the cached scale.
+        pyramid_is_image_on_screen(screenshot, templates, calibrate=True)
+
+        for _ in range(args.repeat):
+            legacy_found, legacy_ms = timed(legacy_is_image_on_screen, screenshot, templates)
+            pyramid_found, pyramid_ms = timed(pyramid_is_image_on_screen, screenshot, templates)
+
+            legacy_times.append(legacy_ms)
+            pyramid_times.append(pyramid_ms)
+
+        if legacy_found != pyramid_found:
+            disagreements += 1
+
+        print(f"{name[:40]:<40} {str(legacy_found):>8} {legacy_ms:>9.1f} {str(pyramid_found):>8} {pyramid_ms:>9.1f}")
+
+    legacy_median = statistics.median(legacy_times)
+    pyramid_median = statistics.median(pyramid_times)
+
+    print()
+    print(f"Median legacy:  {legacy_median:.1f} ms")
+    print(f"Median pyramid: {pyramid_median:.1f} ms ({legacy_median / max(pyramid_median, 1e-6):.1f}x faster)")
+    print(f"Calibrated UI scale: {pyramidMatcher.calibrated_scale}")
+    print(f"Screenshots with different results: {disagreements} of {len(screenshots)}")
+
+
+if __name__ == "__main__":
+    main()
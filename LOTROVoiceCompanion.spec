@@ -18,6 +18,9 @@ a = Analysis(
     datas=[
         # Füge den gesamten "templates" Ordner hinzu (Quelle, Zielordner in der EXE)
         ('templates', 'templates'),
+
+        # NPC-Namen und die vorher mit "python npcDatabase.py" erstellte npcs.idx
+        ('Resources/NPCs', 'Resources/NPCs'),
         
         # Manuelle Einbindung der Python-Module aus V3 (Sicherheit für relative Imports)
         ('V3/core.py', 'V3'),
@@ -9,6 +9,8 @@ import screenCoordinatesFiles
 import lookForTesseract
 import enableDisableTTS
 import OCRDetectionAndCleanup
+import pollingScheduler
+import getNPCNameFromPluginOutput
 import elevenLabsTTSEngine
 import createAllFilesAndDirectories
 import elevenlabsShowVoicesAvailable
@@ -104,6 +106,10 @@ def ocr_preview(event):
         ocr_text_widget.delete(1.0, tk.END)
         ocr_text_widget.insert(tk.END, globalVariables.text_ocr)
 
+    def show_statistics():
+        ocr_text_widget.delete(1.0, tk.END)
+        ocr_text_widget.insert(tk.END, OCRDetectionAndCleanup.get_statistics())
+
     def show_voices():
         ocr_text_widget.delete(1.0, tk.END)
         ocr_text_widget.insert(tk.END, elevenlabsShowVoicesAvailable.show_all_available_voices())
@@ -124,6 +130,8 @@ def ocr_preview(event):
 
         menu.add_command(label="Refresh OCR", command=get_ocr)
 
+        menu.add_command(label="Show statistics", command=show_statistics)
+
         menu.add_command(label="Generate Audio", command=lambda: startThreads.start_monitoring(
             lambda: manual_audio_generation(ocr_text_widget.get("1.0", "end-1c"))))
 
@@ -140,14 +148,26 @@ def ocr_preview(event):
 
 
 def monitor_loop():
+    scheduler = pollingScheduler.PollingScheduler(pollingScheduler.load_cpu_budget())
+    globalVariables.polling_scheduler = scheduler
+
+    log_watcher = getNPCNameFromPluginOutput.start_log_watcher()
+
     while True:
         try:
-            if OCRDetectionAndCleanup.ocr_detection_and_cleaup():
+            scheduler.set_event_trigger(log_watcher.available)
+            scheduler.start_cycle()
+
+            dialog_found = OCRDetectionAndCleanup.ocr_detection_and_cleaup()
+
+            if dialog_found:
 
                 if globalVariables.enable_disable:
                     elevenLabsTTSEngine.tts_engine(globalVariables.text_ocr)
 
-            time.sleep(0.5)
+            # Neue Zeile in der Script.log weckt die Schleife sofort auf
+            if log_watcher.wait(scheduler.next_interval(dialog_found)):
+                scheduler.triggered()
         except Exception:
             time.sleep(1)
             continue
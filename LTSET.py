@@ -10,6 +10,8 @@ import screenCoordinatesFiles
 import lookForTesseract
 import enableDisableTTS
 import OCRDetectionAndCleanup
+import pollingScheduler
+import getNPCNameFromPluginOutput
 import createAllFilesAndDirectories
 
 rect_color = "#ffcccb"
@@ -79,6 +81,10 @@ def ocr_preview(event):
         ocr_text_widget.delete(1.0, tk.END)
         ocr_text_widget.insert(tk.END, globalVariables.text_ocr)
 
+    def show_statistics():
+        ocr_text_widget.delete(1.0, tk.END)
+        ocr_text_widget.insert(tk.END, OCRDetectionAndCleanup.get_statistics())
+
     if ocr_text_window is None or not ocr_text_window.winfo_exists():
         ocr_text_window = tk.Toplevel(root)
         ocr_text_window.title("OCR Result")
@@ -95,6 +101,8 @@ def ocr_preview(event):
 
         menu.add_command(label="Refresh OCR", command=get_ocr)
 
+        menu.add_command(label="Show statistics", command=show_statistics)
+
         menu.add_command(label="Generate Audio",
                          command=lambda: startThreads.start_monitoring(lambda: startThreads.monitor_loop(
                              manual_audio_generation(ocr_text_widget.get("1.0", "end-1c")))))
@@ -109,14 +117,26 @@ def ocr_preview(event):
 
 
 async def monitor_loop_async():
+    scheduler = pollingScheduler.PollingScheduler(pollingScheduler.load_cpu_budget())
+    globalVariables.polling_scheduler = scheduler
+
+    log_watcher = getNPCNameFromPluginOutput.start_log_watcher()
+
     while True:
         try:
-            if OCRDetectionAndCleanup.ocr_detection_and_cleaup():
+            scheduler.set_event_trigger(log_watcher.available)
+            scheduler.start_cycle()
+
+            dialog_found = OCRDetectionAndCleanup.ocr_detection_and_cleaup()
+
+            if dialog_found:
 
                 if globalVariables.enable_disable:
                     await edgeTTSEngine.tts_engine(globalVariables.text_ocr)
 
-            await asyncio.sleep(0.5)
+            # Neue Zeile in der Script.log weckt die Schleife sofort auf
+            if await asyncio.to_thread(log_watcher.wait, scheduler.next_interval(dialog_found)):
+                scheduler.triggered()
         except Exception:
             await asyncio.sleep(1)
             continue
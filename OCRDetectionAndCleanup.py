@@ -1,11 +1,30 @@
+import time
 import globalVariables
 import isQuestWindowOpen
-import pytesseract
-from PIL import ImageGrab
+import ocrBackend
+import screenCapture
+import frameChangeGate
+import ocrCache
 import lookForTesseract
+import clientLanguage
+import ocrQualityGate
 import cleanText
 import getNPCNameFromPluginOutput  # WICHTIG: Das hier fehlte oder wurde nicht genutzt
 
+ocr_cache = ocrCache.OcrCache(globalVariables.config_path + r"/ocr_cache.json")
+
+# tesseract_lang.txt is read once per session. With several languages (e.g. "deu+eng") the client
+# language is detected from the first dialogs and NPC names, then only that model is used.
+configured_language = None
+language_detector = None
+
+# ocr_min_confidence.txt, also read once per session
+min_confidence = None
+
+# Seconds spent in each stage of the last detect_and_read call (detect, crop, binarize, tesseract, clean).
+last_timings = {}
+
+
 def ocr_detection_and_cleaup():
     start_x = globalVariables.start_x
     start_y = globalVariables.start_y
@@ -17,33 +36,111 @@ def ocr_detection_and_cleaup():
     if end_y < start_y:
         start_y, end_y = end_y, start_y
 
-    if isQuestWindowOpen.is_image_on_screen():
+    # Ein einziger Screenshot pro Zyklus, den Erkennung und OCR gemeinsam nutzen
+    frame = screenCapture.capture_frame()
+
+    # Hat sich am Quest-Fenster und im OCR-Bereich nichts geändert, gilt das letzte Ergebnis weiter
+    signature = frameChangeGate.frame_signature(frame, (start_x, start_y, end_x, end_y),
+                                                isQuestWindowOpen.template_regions())
+
+    if frameChangeGate.is_unchanged(signature):
+        return frameChangeGate.last_result()
+
+    result = detect_and_read(frame, start_x, start_y, end_x, end_y)
+
+    if result is None:
+        # Fehler beim Lesen: nächsten Zyklus nicht überspringen, sondern neu versuchen
+        frameChangeGate.reset()
+        return False
+
+    frameChangeGate.remember(signature, result)
+
+    return result
+
+
+def session_language():
+    global configured_language, language_detector
+
+    if configured_language is None:
+        configured_language = lookForTesseract.load_tesseract_lang() or "eng"
+        language_detector = clientLanguage.ClientLanguageDetector(configured_language.split("+"))
+
+    if language_detector.language:
+        return language_detector.language
+
+    return configured_language
+
+
+def session_min_confidence():
+    global min_confidence
+
+    if min_confidence is None:
+        min_confidence = ocrQualityGate.load_min_confidence()
+
+    return min_confidence
+
+
+def detect_and_read(frame, start_x, start_y, end_x, end_y, lang=None):
+    last_timings.clear()
+
+    start = time.perf_counter()
+    quest_window_open = isQuestWindowOpen.is_image_on_screen(frame)
+    last_timings["detect"] = time.perf_counter() - start
+
+    if quest_window_open:
         try:
-            screenshot = ImageGrab.grab(bbox=(start_x, start_y, end_x, end_y))
+            start = time.perf_counter()
+            screenshot = frame.crop_rgb(start_x, start_y, end_x, end_y)
+            last_timings["crop"] = time.perf_counter() - start
 
-            globalVariables.tesseract_language = lookForTesseract.load_tesseract_lang()
+            globalVariables.tesseract_language = lang or session_language()
 
-            if not globalVariables.tesseract_language:
-                globalVariables.tesseract_language = "eng"
+            # Gleiche Quest-Seite schon einmal gelesen? Dann Tesseract überspringen
+            start = time.perf_counter()
+            image_hash = ocrCache.image_hash(ocrCache.binarize(screenshot))
+            last_timings["binarize"] = time.perf_counter() - start
 
-            text = pytesseract.image_to_string(screenshot, lang=globalVariables.tesseract_language)
-            
-            # Text bereinigen
-            cleaned_text = cleanText.clear(text)
-            
-            # Wenn kein Text da ist, brich ab
-            if not cleaned_text or len(cleaned_text.strip()) < 2:
-                return False
+            cleaned_text = ocr_cache.lookup(image_hash, globalVariables.tesseract_language)
+
+            if cleaned_text is None:
+                start = time.perf_counter()
+                result = ocrBackend.recognize(screenshot, globalVariables.tesseract_language)
+                last_timings["tesseract"] = time.perf_counter() - start
+
+                # Halb aufgebaute Fenster oder falsche Ausschnitte gar nicht erst vorlesen
+                if not ocrQualityGate.check(result, session_min_confidence()):
+                    return False
+
+                text = result.text
+
+                # Text bereinigen
+                start = time.perf_counter()
+                cleaned_text = cleanText.clear(text)
+                last_timings["clean"] = time.perf_counter() - start
+
+                if language_detector is not None:
+                    language_detector.observe_text(cleaned_text)
+
+                # Wenn kein Text da ist, brich ab
+                if not cleaned_text or len(cleaned_text.strip()) < 2:
+                    return False
+
+                ocr_cache.store(image_hash, globalVariables.tesseract_language, cleaned_text)
 
             globalVariables.text_ocr = cleaned_text
             
             # --- NEU: NPC Namen und Geschlecht holen ---
             # Wir lesen jetzt das Plugin-Log aus, um zu wissen, WER spricht.
-            gender, name = getNPCNameFromPluginOutput.get_npc_gender_by_name()
+            # Der Name wird zuerst in der NPC-Datei der erkannten Client-Sprache gesucht
+            client_language = language_detector.language if language_detector is not None else None
+            gender, name = getNPCNameFromPluginOutput.get_npc_gender_by_name(client_language)
             
             # Speichere es in den globalen Variablen, damit ElevenLabs es findet
             globalVariables.npc_gender = gender
             globalVariables.npc_name = name
+
+            if language_detector is not None:
+                language_detector.observe_npc(name)
             
             print(f"OCR erfolgreich. Erkannt: '{name}' ({gender})")
             # -------------------------------------------
@@ -52,6 +149,32 @@ def ocr_detection_and_cleaup():
             
         except Exception as e:
             print(f"Fehler in OCR Cleanup: {e}")
-            return False
+            return None
 
     return False
+
+
+def get_statistics():
+    detection = isQuestWindowOpen.detection_stats
+    gate = frameChangeGate.gate_stats
+
+    lines = [
+        f"Cycles: {gate['cycles']}",
+        f"Skipped (screen unchanged): {gate['skipped']}",
+        f"Detection near last position: {detection['local_hits']} hits, {detection['local_misses']} misses",
+        f"Full screen searches: {detection['full_searches']}",
+        f"OCR cache: {ocr_cache.hits} hits, {ocr_cache.misses} misses ({ocr_cache.hit_rate:.0%})",
+        f"OCR results rejected: {ocrQualityGate.gate_stats['rejected_confidence']} low confidence, "
+        f"{ocrQualityGate.gate_stats['rejected_words']} too few real words "
+        f"(of {ocrQualityGate.gate_stats['checked']})",
+    ]
+
+    scheduler = globalVariables.polling_scheduler
+
+    if scheduler is not None:
+        lines.append(f"Polling interval: {scheduler.stats['interval']:.2f} s")
+        lines.append(f"CPU usage: {scheduler.stats['cpu_percent']:.1f} % "
+                     f"(budget {scheduler.cpu_budget * 100:.0f} %, throttled {scheduler.stats['budget_throttled']} times)")
+        lines.append(f"Woken up by Script.log: {scheduler.stats['triggered']}")
+
+    return "\n".join(lines)
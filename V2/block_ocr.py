@@ -0,0 +1,138 @@
+import os
+import sys
+import cv2
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+
+# Lange Quest-Texte werden in Textblöcke zerlegt, die parallel in eigenen Prozessen
+# gelesen und danach in Lesereihenfolge wieder zusammengesetzt werden.
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Jeder Prozess bekommt einen Abschnitt von mindestens dieser Höhe, kleinere Blöcke
+# werden zusammengelegt (jeder Tesseract-Aufruf hat einen festen Grundaufwand)
+MIN_CHUNK_HEIGHT = 80
+MIN_BLOCK_AREA = 400
+BLOCK_PAD = 4
+
+_pool = None
+
+
+def _init_worker(tesseract_cmd):
+    sys.path.insert(0, ROOT_DIR)
+    import pytesseract
+    pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
+
+
+def _ocr_block(args):
+    import ocrBackend
+    image, lang, psm = args
+    return ocrBackend.recognize(image, lang, psm=psm)
+
+
+def get_pool(tesseract_cmd):
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=pool_size(), initializer=_init_worker, initargs=(tesseract_cmd,))
+    return _pool
+
+
+def shutdown_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def pool_size():
+    return max(1, min(4, (os.cpu_count() or 2) - 1))
+
+
+def split_tall_block(binarized, block, max_height):
+    """ Teilt einen hohen Block an leeren Pixelzeilen (zwischen Textzeilen) auf. """
+    x, y, w, h = block
+    if h <= max_height:
+        return [block]
+
+    # Zeilenprofil: Anzahl weißer Pixel pro Zeile
+    profile = np.count_nonzero(binarized[y:y+h, x:x+w], axis=1)
+    blank_rows = np.flatnonzero(profile == 0)
+
+    parts = []
+    start = 0
+    while h - start > max_height:
+        candidates = blank_rows[(blank_rows > start) & (blank_rows <= start + max_height)]
+        if len(candidates) == 0:
+            break
+        cut = int(candidates[-1])
+        parts.append((x, y + start, w, cut - start))
+        start = cut
+    parts.append((x, y + start, w, h - start))
+    return parts
+
+
+def find_text_blocks(binarized):
+    """ Gleiche Logik wie die Dialogsuche der Engine: dilatieren, Konturen suchen, nach Größe filtern. """
+    kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (25, 5))
+    dilated = cv2.dilate(binarized, kernel, iterations=2)
+    contours, _ = cv2.findContours(dilated, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+
+    h_img, w_img = binarized.shape[:2]
+    blocks = []
+    for c in contours:
+        if cv2.contourArea(c) < MIN_BLOCK_AREA: continue
+        bx, by, bw, bh = cv2.boundingRect(c)
+        x1 = max(0, bx - BLOCK_PAD)
+        y1 = max(0, by - BLOCK_PAD)
+        x2 = min(w_img, bx + bw + BLOCK_PAD)
+        y2 = min(h_img, by + bh + BLOCK_PAD)
+        blocks.append((x1, y1, x2 - x1, y2 - y1))
+
+    # Lesereihenfolge: von oben nach unten, dann von links nach rechts
+    blocks.sort(key=lambda b: (b[1], b[0]))
+    return blocks
+
+
+def plan_chunks(binarized, workers):
+    """ Verteilt die Textblöcke auf etwa `workers` gleich hohe Abschnitte in Lesereihenfolge. """
+    blocks = find_text_blocks(binarized)
+    if not blocks:
+        return []
+
+    target = max(MIN_CHUNK_HEIGHT, -(-sum(b[3] for b in blocks) // workers))
+
+    parts = []
+    for block in blocks:
+        parts.extend(split_tall_block(binarized, block, target))
+
+    chunks = []
+    for x, y, w, h in parts:
+        if chunks:
+            cx, cy, cw, ch = chunks[-1]
+            # Nur direkt untereinander liegende Blöcke zusammenlegen
+            if y >= cy + ch - BLOCK_PAD * 2 and (y + h) - cy <= target:
+                x1 = min(cx, x)
+                x2 = max(cx + cw, x + w)
+                chunks[-1] = (x1, cy, x2 - x1, (y + h) - cy)
+                continue
+        chunks.append((x, y, w, h))
+    return chunks
+
+
+def ocr_blocks(binarized, lang, psm=6, tesseract_cmd=None):
+    """
+    Liest das binarisierte Bild blockweise parallel. Bei nur einem Block direkt im Prozess.
+    Gibt ein ocrBackend.OcrResult mit den Wort-Konfidenzen aller Blöcke zurück.
+    """
+    import ocrBackend
+
+    chunks = plan_chunks(binarized, pool_size())
+    if len(chunks) < 2:
+        return ocrBackend.recognize(binarized, lang, psm=psm)
+
+    jobs = [(np.ascontiguousarray(binarized[y:y+h, x:x+w]), lang, psm) for x, y, w, h in chunks]
+    pool = get_pool(tesseract_cmd)
+    results = [r for r in pool.map(_ocr_block, jobs) if r.text.strip()]
+    for r in results:
+        r.text = r.text.strip("\n")
+    return ocrBackend.OcrResult.merge(results)
@@ -0,0 +1,123 @@
+import re
+import time
+import threading
+from collections import deque
+import numpy as np
+
+# Erkennt, ob ein Text (fast) gleich einem in den letzten Minuten vorgelesenen Text ist, z.B. beim
+# Hin- und Herblättern zwischen Quest-Seiten. Statt jeden alten Text mit difflib zu vergleichen,
+# bekommt jeder Text eine MinHash-Signatur über seine Buchstaben-Fünfergruppen. Über LSH-Bänder
+# (Teilstücke der Signatur als Dictionary-Schlüssel) werden nur ähnliche Kandidaten geprüft,
+# die Abfrage dauert also unabhängig von der Anzahl gespeicherter Texte gleich lang.
+
+NUM_PERM = 64
+BANDS = 16
+
+# Geschätzte Jaccard-Ähnlichkeit der Gruppen, ab der ein Text als schon gelesen gilt
+# (ein OCR-Fehler verändert nur die paar Gruppen um den Buchstaben, ein anderer Text fast alle)
+THRESHOLD = 0.7
+
+# Buchstaben statt Wörter: ein falsch gelesener Buchstabe kostet so nur wenige Gruppen
+SHINGLE_SIZE = 5
+
+# Primzahl größer 2^32: a*x + b passt für 32-Bit-Werte noch in uint64
+_PRIME = np.uint64(4294967311)
+
+_word_pattern = re.compile(r"\w+")
+
+
+def shingles(text):
+    normalized = " ".join(_word_pattern.findall(text.lower()))
+    if len(normalized) <= SHINGLE_SIZE:
+        return {normalized} if normalized else set()
+    return {normalized[i:i + SHINGLE_SIZE] for i in range(len(normalized) - SHINGLE_SIZE + 1)}
+
+
+class NearDuplicateIndex:
+    def __init__(self, window_seconds=600, threshold=THRESHOLD, num_perm=NUM_PERM, bands=BANDS, seed=1):
+        self.window_seconds = window_seconds
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+
+        rng = np.random.default_rng(seed)
+        self.a = rng.integers(1, 2**32, size=num_perm, dtype=np.uint64)
+        self.b = rng.integers(0, 2**32, size=num_perm, dtype=np.uint64)
+
+        # Band-Nummer -> {Band-Werte: Eintrags-IDs}
+        self.buckets = [{} for _ in range(bands)]
+        self.entries = {}
+        self.order = deque()
+        self.next_id = 0
+        self.lock = threading.Lock()
+
+    def signature(self, text):
+        items = shingles(text)
+        if not items:
+            return None
+
+        # hash() ist pro Prozess zufällig gesalzen, reicht aber für einen Index im Speicher
+        base = np.fromiter((hash(s) & 0xFFFFFFFF for s in items), dtype=np.uint64, count=len(items))
+        hashes = (np.outer(base, self.a) + self.b) % _PRIME
+        return hashes.min(axis=0)
+
+    def band_keys(self, signature):
+        return [signature[i * self.rows:(i + 1) * self.rows].tobytes() for i in range(self.bands)]
+
+    def expire(self, now):
+        while self.order and now - self.order[0][0] > self.window_seconds:
+            _, entry_id = self.order.popleft()
+            _, keys, _ = self.entries.pop(entry_id)
+            for band, key in enumerate(keys):
+                ids = self.buckets[band].get(key)
+                if ids is not None:
+                    ids.discard(entry_id)
+                    if not ids:
+                        del self.buckets[band][key]
+
+    def find(self, text, now=None):
+        """ Gibt (gespeicherter Text, Ähnlichkeit) des ähnlichsten Treffers zurück, sonst None. """
+        signature = self.signature(text)
+        if signature is None:
+            return None
+
+        now = time.monotonic() if now is None else now
+        with self.lock:
+            self.expire(now)
+
+            candidates = set()
+            for band, key in enumerate(self.band_keys(signature)):
+                candidates.update(self.buckets[band].get(key, ()))
+
+            best = None
+            for entry_id in candidates:
+                stored_signature, _, stored_text = self.entries[entry_id]
+                similarity = float(np.mean(stored_signature == signature))
+                if similarity >= self.threshold and (best is None or similarity > best[1]):
+                    best = (stored_text, similarity)
+
+        return best
+
+    def add(self, text, now=None):
+        signature = self.signature(text)
+        if signature is None:
+            return
+
+        now = time.monotonic() if now is None else now
+        keys = self.band_keys(signature)
+        with self.lock:
+            self.expire(now)
+
+            entry_id = self.next_id
+            self.next_id += 1
+            self.entries[entry_id] = (signature, keys, text)
+            self.order.append((now, entry_id))
+            for band, key in enumerate(keys):
+                self.buckets[band].setdefault(key, set()).add(entry_id)
+
+    def clear(self):
+        with self.lock:
+            for bucket in self.buckets:
+                bucket.clear()
+            self.entries.clear()
+            self.order.clear()
@@ -0,0 +1,100 @@
+import os
+import threading
+import datetime
+from collections import deque
+import cv2
+from utils import log_message
+
+# Diagnose-Ringpuffer: Die letzten Scans (Screenshot, Ausschnitt, binarisiertes Bild, Roh- und
+# bereinigter Text) bleiben nur im Speicher. Auf die Platte geschrieben wird erst auf Wunsch
+# (Button/Hotkey) oder automatisch nach einem Fehler, und zwar in einem Hintergrund-Thread,
+# damit der Scan selbst kein PNG kodieren und keine Dateien schreiben muss.
+# Der ganze Screenshot wird nur verkleinert gehalten (4K: 25 MB pro Scan, bei 0.25 etwa 1,5 MB).
+# Ausschnitt und binarisiertes Bild bleiben in voller Auflösung, solange sie klein sind (Dialog
+# gefunden); sonst, z.B. ohne gefundenen Dialog, werden sie wie der Screenshot verkleinert.
+
+DIAGNOSTICS_DIR = "Diagnostics"
+
+# Bilder, die pro Scan gespeichert werden (Schlüssel im Eintrag -> Dateiname)
+IMAGE_FIELDS = (("frame", "frame.png"), ("crop", "crop.png"), ("binarized", "binarized.png"))
+
+# Maßstab des gespeicherten Screenshots, 0 = keinen Screenshot behalten
+DEFAULT_FRAME_SCALE = 0.25
+
+# Größere Bilder (Pixel) gelten nicht als Dialog-Ausschnitt und werden auch verkleinert
+MAX_FULL_SIZE_PIXELS = 1280 * 720
+
+
+class DiagnosticRecorder:
+    def __init__(self, capacity=5, directory=DIAGNOSTICS_DIR, frame_scale=DEFAULT_FRAME_SCALE):
+        self.directory = directory
+        self.entries = deque(maxlen=max(1, capacity))
+        self.frame_scale = min(1.0, max(0.0, frame_scale))
+        self.lock = threading.Lock()
+
+    def small_image(self, image):
+        if image is None or self.frame_scale <= 0:
+            return None
+        if self.frame_scale >= 1.0:
+            return image
+        # Bilinear: etwa 2 ms bei 4K, INTER_AREA wäre mehr als siebenmal so langsam
+        return cv2.resize(image, None, fx=self.frame_scale, fy=self.frame_scale, interpolation=cv2.INTER_LINEAR)
+
+    def record(self, **fields):
+        """
+        Legt einen Scan ab. Kleine Bilder werden nicht kopiert, die Engine verändert sie danach
+        nicht mehr; vom Screenshot und von großen Bildern bleibt nur die verkleinerte Kopie
+        (ein Ausschnitt ohne Kopie hielte sonst den ganzen Screenshot im Speicher).
+        """
+        fields["frame"] = self.small_image(fields.get("frame"))
+        for field in ("crop", "binarized"):
+            image = fields.get(field)
+            if image is not None and image.shape[0] * image.shape[1] > MAX_FULL_SIZE_PIXELS:
+                fields[field] = self.small_image(image)
+        fields["time"] = datetime.datetime.now()
+        with self.lock:
+            self.entries.append(fields)
+
+    def snapshot(self):
+        with self.lock:
+            return list(self.entries)
+
+    def flush_async(self, reason="manuell"):
+        """ Schreibt den aktuellen Inhalt des Puffers im Hintergrund in einen neuen Ordner. """
+        entries = self.snapshot()
+        if not entries:
+            log_message("Diagnose: Noch keine Scans aufgezeichnet.")
+            return None
+
+        thread = threading.Thread(target=self.write, args=(entries, reason), daemon=True)
+        thread.start()
+        return thread
+
+    def write(self, entries, reason):
+        folder = os.path.join(self.directory, datetime.datetime.now().strftime("%Y%m%d_%H%M%S_%f"))
+        try:
+            os.makedirs(folder, exist_ok=True)
+
+            for index, entry in enumerate(entries, 1):
+                prefix = os.path.join(folder, f"{index:02d}_")
+
+                for field, filename in IMAGE_FIELDS:
+                    image = entry.get(field)
+                    if image is not None and image.size:
+                        cv2.imwrite(prefix + filename, image)
+
+                with open(prefix + "text.txt", "w", encoding="utf-8") as f:
+                    f.write(f"Zeit: {entry['time']:%H:%M:%S.%f}\n")
+                    if entry.get("timings"):
+                        f.write("Zeiten: " + ", ".join(f"{name} {seconds * 1000:.1f} ms"
+                                                       for name, seconds in entry["timings"].items()) + "\n")
+                    if entry.get("error"):
+                        f.write(f"Fehler: {entry['error']}\n")
+                    f.write("\n--- RAW TESSERACT OUTPUT ---\n")
+                    f.write(entry.get("raw_text") or "")
+                    f.write("\n\n--- FILTERED OUTPUT (SEND TO AI) ---\n")
+                    f.write(entry.get("clean_text") or "")
+
+            log_message(f"Diagnose ({reason}): {len(entries)} Scans gespeichert in {folder}")
+        except Exception as e:
+            log_message(f"Diagnose konnte nicht gespeichert werden: {e}")
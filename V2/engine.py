@@ -2,20 +2,48 @@ import pytesseract
 import requests
 import hashlib
 import os
+import sys
 import time
 import pygame
-import re
-import difflib
 import cv2
 import numpy as np
 import threading # Neu: Für asynchrone Audioausgabe
 import shutil # Neu: Für Cache-Bereinigung
 from requests.exceptions import RequestException # Neu: Für spezifische Fehlerbehandlung
 from utils import load_config, load_mapping, save_mapping, log_message
+import block_ocr
+import scroll_ocr
+import diagnostics
+import dedup
+import preprocessing
+
+# Gemeinsame Module (z.B. Bildschirmaufnahme) liegen im Hauptordner des Projekts
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import screenCapture
+import ocrBackend
+import ocrCache
+import audioCacheKeys
+import streamingPlayback
+import npcIndex
+import clientLanguage
+import ocrQualityGate
+import textNormalizer
 
 # Konstante für die maximale Cache-Größe in Bytes (z.B. 1 GB)
 MAX_CACHE_SIZE_BYTES = 1024 * 1024 * 1024 
 
+OCR_CACHE_FILE = "ocr_cache.json"
+
+# Eigene Ersetzungen (Zeile: alt,neu), wie replace_string.txt der alten Version
+REPLACE_RULES_FILE = "replace_string.txt"
+
+# Typische Fehllesungen der LOTRO-Schrift, werden entfernt bzw. ersetzt
+BUILTIN_REPLACEMENTS = {"oo": "", "Oo": "", "oO": "", "Solo": "", "solo": "", "NYZ B": "", "„Aa 1": "", "‘": "'"}
+
+# Breite der Randstreifen (Pixel) und erlaubte Helligkeitsänderung beim Verfolgen des Dialogs
+TRACKING_BORDER = 6
+TRACKING_MAX_BRIGHTNESS_DIFF = 12
+
 class VoiceEngine:
     def __init__(self):
         self.config = load_config()
@@ -33,6 +61,52 @@ class VoiceEngine:
         
         # Cache bei Initialisierung aufräumen
         self._clean_cache() 
+
+        # Audio-Cache über einen toleranten Fingerabdruck des Textes (OCR-Fehler kosten keine neue Synthese)
+        self.audio_index = audioCacheKeys.AudioCacheIndex(self.cache_dir)
+
+        # Erkannte Texte pro Quest-Seite, bleibt über Neustarts erhalten
+        self.ocr_cache = ocrCache.OcrCache(OCR_CACHE_FILE)
+
+        # Sprache des Spiels wird einmal pro Sitzung erkannt, danach liest Tesseract nur noch mit einem Modell
+        self.language_detector = clientLanguage.ClientLanguageDetector(self.ocr_languages().split("+"))
+
+        # Alle Ersetzungen in einem Durchlauf, die Regeldatei wird nur nach Änderungen neu gelesen
+        self.normalizer = textNormalizer.TextNormalizer(REPLACE_RULES_FILE, BUILTIN_REPLACEMENTS, whitelist=None)
+
+        # NPC-Namen aller Sprachen, einmal beim Start eingelesen
+        self.npc_index = npcIndex.get_index()
+
+        # Zuletzt vorgelesene Texte, um sie beim Zurückblättern nicht erneut vorzulesen
+        self.recent_texts = dedup.NearDuplicateIndex(self.dedup_window_seconds())
+
+        # Letzte Scans nur im Speicher, gespeichert wird auf Wunsch oder nach einem Fehler
+        self.diagnostics = diagnostics.DiagnosticRecorder(
+            self.config.get("diagnostic_scans", 5),
+            frame_scale=self.config.get("diagnostic_frame_scale", diagnostics.DEFAULT_FRAME_SCALE))
+
+        # Letztes Dialog-Rechteck (x1, y1, x2, y2) und Helligkeit seines Randes, um die Suche zu sparen
+        self.last_dialog_rect = None
+        self.last_dialog_signature = None
+        self.tracking_stats = {"hits": 0, "misses": 0}
+        self.last_timings = {}
+
+        # Vorverarbeitung als Stufen, jede mit eigener Zeitmessung
+        self.preprocess_pipeline = preprocessing.Pipeline([
+            ("track", self.stage_track),
+            ("mask", self.stage_mask),
+            ("dilate", self.stage_dilate),
+            ("contours", self.stage_contours),
+            ("crop", self.stage_crop),
+            ("binarize", self.stage_binarize),
+        ])
+        self.binarize_pipeline = preprocessing.Pipeline([("binarize", self.stage_binarize)])
+
+        # Zuletzt gelesenes Dialogrechteck (binarisiert, vor dem Zuschnitt auf den Inhalt),
+        # für inkrementelles OCR beim Scrollen
+        self.last_ocr_image = None
+        self.last_ocr_origin = (0, 0)
+        self.last_raw_text = ""
         
         tess_path = self.config.get("tesseract_path", r"C:\Program Files\Tesseract-OCR\tesseract.exe")
         pytesseract.pytesseract.tesseract_cmd = tess_path
@@ -44,6 +118,7 @@ class VoiceEngine:
         
         for root, _, files in os.walk(self.cache_dir):
             for name in files:
+                if name == audioCacheKeys.index_filename: continue  # Index nicht wegräumen
                 filepath = os.path.join(root, name)
                 if os.path.exists(filepath):
                     stat = os.stat(filepath)
@@ -69,11 +144,25 @@ class VoiceEngine:
 
     # --- Ursprüngliche Methoden (unverändert) ---
 
-    def is_new_text(self, new_text, old_text):
-        if not new_text or len(new_text) < 15: return False
-        if not old_text: return True
-        ratio = difflib.SequenceMatcher(None, new_text, old_text).ratio()
-        return ratio <= 0.85
+    def dedup_window_seconds(self):
+        try:
+            return float(self.config.get("dedup_window_minutes", 10)) * 60
+        except (TypeError, ValueError):
+            return 600
+
+    def is_new_text(self, new_text):
+        """ False, wenn der Text (bis auf OCR-Fehler) in den letzten Minuten schon vorgelesen wurde. """
+        if not new_text: return False
+        self.recent_texts.window_seconds = self.dedup_window_seconds()
+        if self.recent_texts.window_seconds <= 0: return True
+        match = self.recent_texts.find(new_text)
+        if match:
+            log_message(f"Schon vorgelesen (Ähnlichkeit {match[1]:.0%}): {match[0][:40]}...")
+            return False
+        return True
+
+    def remember_spoken(self, text):
+        self.recent_texts.add(text)
 
     def fetch_voices(self):
         api_key = self.config.get("api_key", "").strip()
@@ -100,6 +189,13 @@ class VoiceEngine:
                     lines = f.readlines()
                     if lines:
                         last = lines[-1].strip()
+                        # NPC-Datei der erkannten Client-Sprache zuerst
+                        # Kleine Schreibfehler werden dem Namen aus der Datei zugeordnet (gleiche Stimme)
+                        found = self.npc_index.match(last, self.language_detector.language)
+                        known = npcIndex.genders.get(found[1]) if found else None
+                        if known:
+                            return found[0], known.capitalize()
+                        # Name unbekannt: alte Schätzung über Wörter in der Zeile
                         gender = "Female" if any(x in last.lower() for x in ["female", "frau", "she"]) else "Male"
                         return last, gender
         except: pass
@@ -128,20 +224,14 @@ class VoiceEngine:
         save_mapping(mapping)
         return vid, "Berechnet"
 
-    def generate_and_play(self, text, npc_name_fallback="Unknown"):
+    def generate_and_play(self, text, npc_name_fallback="Unknown", on_played=None):
+        """on_played wird erst nach erfolgreicher Wiedergabe aufgerufen (im Wiedergabe-Thread)."""
         delay = float(self.config.get("audio_delay", 0.5))
         if delay > 0: time.sleep(delay)
 
-        text_hash = hashlib.md5(text.encode('utf-8')).hexdigest()
-        cache_file = os.path.join(self.cache_dir, f"quest_{text_hash}.mp3")
-
-        if os.path.exists(cache_file):
-            log_message("Spiele aus Cache...")
-            # *** Änderung: Asynchrone Wiedergabe ***
-            threading.Thread(target=self._play_audio_thread, args=(cache_file,)).start()
-            return
-
+        # Stimme zuerst: Audio aus dem Cache gilt nur in der Stimme dieses NPCs
         npc_log, gender = self.get_npc_from_log()
+        self.language_detector.observe_npc(npc_log)
         name = npc_log if npc_log != "Unknown" else npc_name_fallback
         
         vid, method = self.select_voice(name, gender)
@@ -153,30 +243,62 @@ class VoiceEngine:
             log_message("ABBRUCH: Konnte keine Stimme zuweisen.")
             return
 
-        log_message(f"Generiere neu: '{name}' ({method})")
+        cached_file = self.audio_index.lookup(text, vid)
+        if cached_file is None:
+            # Dateien der alten Benennung (MD5 des genauen Textes)
+            text_hash = hashlib.md5(text.encode('utf-8')).hexdigest()
+            old_file = os.path.join(self.cache_dir, f"quest_{text_hash}.mp3")
+            if os.path.exists(old_file): cached_file = old_file
+
+        if cached_file:
+            log_message("Spiele aus Cache...")
+            # *** Änderung: Asynchrone Wiedergabe ***
+            threading.Thread(target=self._play_audio_thread, args=(cached_file, on_played)).start()
+            return
+
+        # Satzweise: die Wiedergabe beginnt nach dem ersten Satz, der Rest wird parallel erzeugt
+        chunks = streamingPlayback.split_chunks(text)
+        log_message(f"Generiere neu: '{name}' ({method}), {len(chunks)} Abschnitt(e)")
+        # *** Änderung: Asynchrone Wiedergabe ***
+        threading.Thread(target=self._stream_thread, args=(chunks, vid, on_played)).start()
+
+    def _stream_thread(self, chunks, vid, on_played=None):
+        try:
+            if not streamingPlayback.play_stream(chunks, lambda chunk: self._synthesize_chunk(chunk, vid)):
+                log_message("Wiedergabe abgebrochen: Abschnitt konnte nicht erzeugt werden.")
+            elif on_played:
+                on_played()
+        except Exception as e:
+            log_message(f"TTS Fehler: {e}")
+
+    def _synthesize_chunk(self, chunk, vid):
+        """Erzeugt einen Abschnitt (läuft parallel in einem Worker-Thread), jeder Abschnitt wird einzeln gecacht."""
+        cached_file = self.audio_index.lookup(chunk, vid)
+        if cached_file: return cached_file
+
+        cache_file = os.path.join(self.cache_dir, self.audio_index.filename_for(chunk, "quest_", vid))
         try:
             # *** Verbesserung: Similarity Boost in Voice Settings hinzugefügt und anpassbar gemacht ***
             voice_settings = self.config.get("voice_settings", {"stability": 0.5, "similarity_boost": 0.75})
             
             headers = {"xi-api-key": self.config.get("api_key", ""), "Content-Type": "application/json"}
-            data = {"text": text, "model_id": "eleven_turbo_v2_5", "voice_settings": voice_settings}
+            data = {"text": chunk, "model_id": "eleven_turbo_v2_5", "voice_settings": voice_settings}
             
             resp = requests.post(f"https://api.elevenlabs.io/v1/text-to-speech/{vid}", headers=headers, json=data)
             
             if resp.status_code == 200:
                 with open(cache_file, "wb") as f: f.write(resp.content)
-                # *** Änderung: Asynchrone Wiedergabe ***
-                threading.Thread(target=self._play_audio_thread, args=(cache_file,)).start()
-            else:
-                # *** Verbesserung: Detaillierte API-Fehlermeldung ***
-                error_detail = resp.json().get('detail', 'Keine Details verfügbar.') if 'application/json' in resp.headers.get('Content-Type', '') else resp.text
-                log_message(f"API Fehler ({resp.status_code}): {error_detail}")
+                self.audio_index.add(chunk, os.path.basename(cache_file), vid)
+                return cache_file
+
+            # *** Verbesserung: Detaillierte API-Fehlermeldung ***
+            error_detail = resp.json().get('detail', 'Keine Details verfügbar.') if 'application/json' in resp.headers.get('Content-Type', '') else resp.text
+            log_message(f"API Fehler ({resp.status_code}): {error_detail}")
         except RequestException as e:
             log_message(f"Netzwerkfehler bei TTS-Generierung: {e}")
-        except Exception as e:
-            log_message(f"TTS Fehler: {e}")
+        return None
             
-    def _play_audio_thread(self, filepath):
+    def _play_audio_thread(self, filepath, on_played=None):
         """Spielt die Audiodatei im Hintergrund ab (hilft bei nicht-blockierendem Code)."""
         try:
             # Muss immer wieder initialisiert werden, da quit() unten aufgerufen wird
@@ -194,6 +316,8 @@ class VoiceEngine:
             pygame.mixer.music.unload()
             pygame.mixer.quit()
 
+            if on_played: on_played()
+
         except Exception as e:
             log_message(f"Fehler beim Abspielen: {e}")
 
@@ -203,45 +327,85 @@ class VoiceEngine:
         threading.Thread(target=self._play_audio_thread, args=(filepath,)).start()
         
     def get_monitor_screenshot(self):
-        # ... (unverändert)
         mon_idx = int(self.config.get("monitor_index", 1))
         try:
-            with mss.mss() as sct:
-                if mon_idx >= len(sct.monitors): mon_idx = 1
-                monitor = sct.monitors[mon_idx]
-                sct_img = sct.grab(monitor)
-                img = np.array(sct_img)
-                img = cv2.cvtColor(img, cv2.COLOR_BGRA2BGR)
-                return img
+            # Dauerhafte mss-Sitzung statt einer neuen pro Screenshot
+            frame = screenCapture.capture_frame(mon_idx)
+            if frame is None: return None
+            return frame.bgr
         except Exception as e:
             log_message(f"Screenshot Fehler: {e}")
             return None
 
-    def crop_to_content(self, img):
-        # ... (unverändert)
-        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-        denoised = cv2.medianBlur(gray, 5) 
-        
-        coords = cv2.findNonZero(denoised)
-        if coords is not None:
-            x, y, w, h = cv2.boundingRect(coords)
-            
-            pad = 5
-            h_img, w_img = img.shape[:2]
-            
-            x = max(0, x - pad)
-            y = max(0, y - pad)
-            w = min(w_img - x, w + 2*pad)
-            h = min(h_img - y, h + 2*pad)
-            
-            return img[y:y+h, x:x+w]
-        
-        return img
+    def ocr_languages(self):
+        return self.config.get("ocr_languages", "deu+eng") or "deu+eng"
+
+    def white_mask(self, img):
+        # Weiß-Maske (gegen Gelb, um weiße Dialogfelder zu finden)
+        return preprocessing.white_mask(img)
+
+    def crop_method(self):
+        method = self.config.get("crop_method", "reduce")
+        return method if method in preprocessing.CROP_METHODS else "reduce"
+
+    def detection_scale(self):
+        try:
+            return min(1.0, max(0.25, float(self.config.get("detection_scale", 1.0))))
+        except (TypeError, ValueError):
+            return 1.0
+
+    def border_signature(self, img, rect):
+        """ Helligkeit der schmalen Streifen rund um das Rechteck und Anzahl weißer Textpixel darin. """
+        x1, y1, x2, y2 = rect
+        h_img, w_img = img.shape[:2]
+        r = TRACKING_BORDER
+        strips = [
+            img[max(0, y1 - r):y1, x1:x2],
+            img[y2:min(h_img, y2 + r), x1:x2],
+            img[y1:y2, max(0, x1 - r):x1],
+            img[y1:y2, x2:min(w_img, x2 + r)],
+        ]
+        means = [float(strip.mean()) if strip.size else -1.0 for strip in strips]
+        white = sum(cv2.countNonZero(self.white_mask(strip)) for strip in strips if strip.size)
+        return means, white
+
+    def track_dialog(self, img):
+        """
+        Prüft günstig, ob der Dialog noch an der letzten Stelle steht: Der Rand um das Rechteck
+        muss gleich hell sein und darf keinen Text enthalten (sonst ist der Text gewachsen).
+        """
+        if self.last_dialog_rect is None:
+            return None
+
+        x1, y1, x2, y2 = self.last_dialog_rect
+        if x2 > img.shape[1] or y2 > img.shape[0]:
+            return None
+
+        means, white = self.border_signature(img, self.last_dialog_rect)
+        if white > 0:
+            return None
+        for mean, last_mean in zip(means, self.last_dialog_signature):
+            if abs(mean - last_mean) > TRACKING_MAX_BRIGHTNESS_DIFF:
+                return None
+
+        return self.last_dialog_rect
+
+    def stage_track(self, ctx):
+        # Steht der Dialog noch an der letzten Stelle? Dann entfällt die Suche über den ganzen Monitor
+        ctx["rect"] = self.track_dialog(ctx["img"])
+        if ctx["rect"] is not None:
+            self.tracking_stats["hits"] += 1
+        else:
+            self.tracking_stats["misses"] += 1
+
+    def stage_mask(self, ctx):
+        img = ctx["img"]
+        if ctx["rect"] is not None:
+            x1, y1, x2, y2 = ctx["rect"]
+            ctx["rect_mask"] = self.white_mask(img[y1:y2, x1:x2])
+            return
 
-    def auto_find_quest_text(self, img):
         h_img, w_img = img.shape[:2]
-        
-        if h_img < 50 or w_img < 50: return img
 
         # Grobe Vor-Eingrenzung (basierend auf LotRO-UI-Layout)
         crop_top = int(h_img * 0.12)  
@@ -251,72 +415,207 @@ class VoiceEngine:
 
         if (crop_top >= h_img - crop_bottom) or (crop_left >= w_img - crop_right):
             potential_dialog_area = img
+            offset_x, offset_y = 0, 0
         else:
             potential_dialog_area = img[crop_top:h_img-crop_bottom, crop_left:w_img-crop_right]
+            offset_x, offset_y = crop_left, crop_top
 
         if potential_dialog_area.shape[0] < 50 or potential_dialog_area.shape[1] < 50:
             potential_dialog_area = img
+            offset_x, offset_y = 0, 0
+
+        ctx["area"] = potential_dialog_area
+        ctx["offset"] = (offset_x, offset_y)
+
+        # 1. Weiß-Maske, optional auf dem verkleinerten Bild
+        ctx["mask"] = self.white_mask(preprocessing.downscale(potential_dialog_area, ctx["scale"]))
+
+    def stage_dilate(self, ctx):
+        if ctx["rect"] is not None:
+            return
 
-        # 1. Weiß-Maske (gegen Gelb, um weiße Dialogfelder zu finden)
-        hsv = cv2.cvtColor(potential_dialog_area, cv2.COLOR_BGR2HSV)
-        lower_white = np.array([0, 0, 160]) 
-        upper_white = np.array([180, 50, 255]) 
-        mask = cv2.inRange(hsv, lower_white, upper_white)
-        
         # 2. Verschmelzen (Dilatieren, um Textblöcke zu verbinden)
-        kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (25, 5))
-        dilated = cv2.dilate(mask, kernel, iterations=2)
-        
-        contours, _ = cv2.findContours(dilated, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-        
-        if not contours:
-            return potential_dialog_area
+        scale = ctx["scale"]
+        # 25x5 in voller Auflösung, verkleinert mitskaliert (ungerade, damit die Maske nicht wandert)
+        kernel_size = (2 * int(np.ceil(12 * scale)) + 1, 2 * int(np.ceil(2 * scale)) + 1)
+        kernel = cv2.getStructuringElement(cv2.MORPH_RECT, kernel_size)
+        ctx["dilated"] = cv2.dilate(ctx["mask"], kernel, iterations=2)
+
+    def stage_contours(self, ctx):
+        if ctx["rect"] is not None:
+            return
+
+        scale = ctx["scale"]
+        contours, _ = cv2.findContours(ctx["dilated"], cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
         
         # *** Verbesserung: Filtere Konturen nach Größe, um Rauschen zu vermeiden ***
-        valid_contours = [c for c in contours if cv2.contourArea(c) > 5000]
+        valid_contours = [c for c in contours if cv2.contourArea(c) > 5000 * scale * scale]
         if not valid_contours:
-            return potential_dialog_area
+            self.last_dialog_rect = None
+            ctx["crop"] = ctx["area"]
+            ctx["region_origin"] = ctx["offset"]
+            return
             
         best_cnt = max(valid_contours, key=cv2.contourArea)
 
-        # Schneide die potential_dialog_area auf die beste Kontur zu
-        rx, ry, rw, rh = cv2.boundingRect(best_cnt)
+        # Schneide die potential_dialog_area auf die beste Kontur zu (zurück in volle Auflösung)
+        area = ctx["area"]
+        offset_x, offset_y = ctx["offset"]
+        rx, ry, rw, rh = (int(round(v / scale)) for v in cv2.boundingRect(best_cnt))
         pad = 5
         rx1 = max(0, rx - pad)
         ry1 = max(0, ry - pad)
-        rx2 = min(potential_dialog_area.shape[1], rx + rw + pad)
-        ry2 = min(potential_dialog_area.shape[0], ry + rh + pad)
-        
-        cropped_roi = potential_dialog_area[ry1:ry2, rx1:rx2]
-        cropped_mask = mask[ry1:ry2, rx1:rx2]
+        rx2 = min(area.shape[1], rx + rw + pad)
+        ry2 = min(area.shape[0], ry + rh + pad)
+
+        rect = (rx1 + offset_x, ry1 + offset_y, rx2 + offset_x, ry2 + offset_y)
+        if scale == 1.0:
+            ctx["rect_mask"] = ctx["mask"][ry1:ry2, rx1:rx2]
+
+        ctx["rect"] = rect
+        self.last_dialog_rect = rect
+        self.last_dialog_signature = self.border_signature(ctx["img"], rect)[0]
+
+    def stage_crop(self, ctx):
+        if "crop" in ctx:
+            return
+
+        x1, y1, x2, y2 = ctx["rect"]
+        cropped_roi = ctx["img"][y1:y2, x1:x2]
+        cropped_mask = ctx.get("rect_mask")
+        if cropped_mask is None:
+            cropped_mask = self.white_mask(cropped_roi)
         
         # 3. Maskieren: Wende die Weiß-Maske auf das zugeschnittene Bild an
         masked_image = cv2.bitwise_and(cropped_roi, cropped_roi, mask=cropped_mask)
         
-        # 4. Auto-Trim (Schwarze Ränder weg)
-        final_image = self.crop_to_content(masked_image)
-        
-        cv2.imwrite("last_detection_debug.png", final_image)
-        
-        return final_image
+        # 4. Auto-Trim (Schwarze Ränder weg). Das ganze Rechteck bleibt für die Scroll-Erkennung:
+        # seine Größe ändert sich beim Scrollen nicht, die des Inhalts schon
+        x, y, w, h = preprocessing.content_box(masked_image, self.crop_method())
+        ctx["region"] = masked_image
+        ctx["region_origin"] = (x1, y1)
+        ctx["crop_box"] = (x, y, w, h)
+        ctx["crop"] = masked_image[y:y+h, x:x+w]
+
+    def stage_binarize(self, ctx):
+        # *** Verbesserung: Zusätzliche Bildvorverarbeitung (Binarisierung) ***
+        region = ctx.get("region")
+        if region is None:
+            region = ctx["crop"]
+            ctx["crop_box"] = (0, 0, region.shape[1], region.shape[0])
+            ctx.setdefault("region_origin", (0, 0))
+
+        gray = cv2.cvtColor(region, cv2.COLOR_BGR2GRAY)
+        # Feste Binarisierung, um Text zu maximieren (Text ist weiß)
+        _, ctx["region_binarized"] = cv2.threshold(gray, 200, 255, cv2.THRESH_BINARY)
+
+        x, y, w, h = ctx["crop_box"]
+        ctx["binarized"] = ctx["region_binarized"][y:y+h, x:x+w]
+
+    def preprocess(self, img):
+        """ Sucht den Quest-Text und binarisiert ihn. Gibt den Kontext mit "crop", "binarized" und "timings" zurück. """
+        ctx = {"img": img, "scale": self.detection_scale(), "timings": {}}
+        h_img, w_img = img.shape[:2]
+
+        if h_img < 50 or w_img < 50:
+            ctx["crop"] = img
+            self.binarize_pipeline.run(ctx)
+        else:
+            self.preprocess_pipeline.run(ctx)
+
+        self.last_timings = ctx["timings"]
+        return ctx
+
+    def format_timings(self):
+        return ", ".join(f"{name} {seconds * 1000:.1f} ms" for name, seconds in self.last_timings.items())
+
+    def read_scrolled_text(self, ctx, lang):
+        """
+        Liest nur die neuen Zeilen, wenn der Text der um dy verschobene vorherige ist.
+        Verglichen werden die Dialogrechtecke an ihrer Bildschirmposition, der Zuschnitt auf den
+        Inhalt ändert beim Scrollen seine Höhe.
+        Die Konfidenzen im Ergebnis gelten nur für die neu gelesenen Zeilen.
+        """
+        if self.last_ocr_image is None:
+            return None
+
+        region = ctx["region_binarized"]
+        prev, cur, (cur_x, cur_y) = scroll_ocr.align_regions(self.last_ocr_image, self.last_ocr_origin,
+                                                             region, ctx["region_origin"])
+        dy = scroll_ocr.find_scroll_offset(prev, cur)
+        if dy is None:
+            return None
+        if dy == 0:
+            return ocrBackend.OcrResult(self.last_raw_text)
+
+        # Neue Zeilen (auf der gemeinsamen Fläche gesucht) im Rechteck, seitlich wie der Inhalt zugeschnitten
+        start = max(0, scroll_ocr.new_rows_start(cur, dy) - cur_y)
+        x, _, w, _ = ctx["crop_box"]
+        result = ocrBackend.recognize(region[start:, x:x+w], lang, psm=6)
+        log_message(f"Gescrollt um {dy} px, lese nur {region.shape[0] - start} neue Pixelzeilen.")
+
+        result.text = scroll_ocr.stitch(self.last_raw_text, result.text,
+                                        prev_cut_off=scroll_ocr.is_cut_off(self.last_ocr_image))
+        return result
 
     def run_ocr(self):
+        img = optimized_img = binarized = None
+        raw_text = ""
         try:
             img = self.get_monitor_screenshot()
             if img is None: return ""
 
-            optimized_img = self.auto_find_quest_text(img)
-            
-            # *** Verbesserung: Zusätzliche Bildvorverarbeitung (Binarisierung) ***
-            gray = cv2.cvtColor(optimized_img, cv2.COLOR_BGR2GRAY)
-            # Feste Binarisierung, um Text zu maximieren (Text ist weiß)
-            _, binarized = cv2.threshold(gray, 200, 255, cv2.THRESH_BINARY) 
-            
-            config = r'--oem 3 --psm 6 -l deu+eng' 
-            
-            # *** Verbesserung: OCR auf binarisiertem Bild ausführen ***
-            raw_text = pytesseract.image_to_string(binarized, config=config)
+            ctx = self.preprocess(img)
+            optimized_img = ctx["crop"]
+            binarized = ctx["binarized"]
+            log_message(f"Vorverarbeitung: {self.format_timings()} "
+                        f"(Rechteck wiederverwendet {self.tracking_stats['hits']}x, gesucht {self.tracking_stats['misses']}x)")
+
+            # Gleiche Quest-Seite schon einmal gelesen? Dann Tesseract überspringen
+            lang = self.language_detector.ocr_language(self.ocr_languages())
+
+            image_hash = ocrCache.image_hash(binarized)
+            cached_text = self.ocr_cache.lookup(image_hash, lang)
+            if cached_text is not None:
+                log_message(f"Text aus OCR-Cache (Trefferquote {self.ocr_cache.hit_rate:.0%})")
+                # Kein Rohtext zum Anhängen vorhanden, beim nächsten Scrollen komplett lesen
+                self.last_ocr_image = None
+                self.diagnostics.record(frame=img, crop=optimized_img, binarized=binarized,
+                                        clean_text=cached_text, timings=dict(self.last_timings))
+                return cached_text
+
+            # Wurde nur gescrollt? Dann nur die neu sichtbaren Zeilen lesen
+            t = time.perf_counter()
+            result = self.read_scrolled_text(ctx, lang)
+
+            if result is None:
+                # *** Verbesserung: OCR auf binarisiertem Bild ausführen ***
+                # Tesseract läuft (falls tesserocr installiert ist) im Prozess statt als neue tesseract.exe
+                if self.config.get("parallel_ocr", True):
+                    # Lange Texte: Textblöcke parallel in mehreren Prozessen lesen
+                    result = block_ocr.ocr_blocks(binarized, lang, psm=6,
+                                                    tesseract_cmd=pytesseract.pytesseract.tesseract_cmd)
+                else:
+                    result = ocrBackend.recognize(binarized, lang, psm=6)
+            self.last_timings["tesseract"] = time.perf_counter() - t
+            raw_text = result.text
+
+            # Halb eingeblendete Fenster oder falsche Ausschnitte nicht an die Sprachausgabe schicken
+            if not ocrQualityGate.check(result, self.config.get("ocr_min_confidence", 55),
+                                        self.config.get("ocr_min_word_ratio", 0.5)):
+                log_message(f"Text verworfen (Konfidenz {result.mean_confidence or 0:.0f}, "
+                            f"bisher {ocrQualityGate.rejected()} von {ocrQualityGate.gate_stats['checked']} verworfen)")
+                # Nicht an verworfenen Text anhängen, nächstes Mal komplett lesen
+                self.last_ocr_image = None
+                self.diagnostics.record(frame=img, crop=optimized_img, binarized=binarized,
+                                        raw_text=raw_text, timings=dict(self.last_timings), error="verworfen")
+                return ""
+
+            self.last_ocr_image = ctx["region_binarized"]
+            self.last_ocr_origin = ctx["region_origin"]
+            self.last_raw_text = raw_text
             
+            t = time.perf_counter()
             lines = raw_text.split('\n')
             
             cleaned_lines = []
@@ -331,21 +630,22 @@ class VoiceEngine:
                 if (is_dialog_start_end or is_dialog_end_punc) or len(stripped) > 20:
                     cleaned_lines.append(stripped)
 
-            clean_output = ' '.join(cleaned_lines)
-            clean_output = re.sub(r'\s+', ' ', clean_output).strip()
-            
-            clean_output = re.sub(r'oo|Oo|oO|Solo|solo|NYZ B|„Aa 1', '', clean_output)
-            clean_output = re.sub(r'‘', "'", clean_output)
+            clean_output = self.normalizer.collapse_whitespace(' '.join(cleaned_lines)).strip()
+            clean_output = self.normalizer.replace(clean_output)
+            self.last_timings["clean"] = time.perf_counter() - t
+
+            if clean_output:
+                self.ocr_cache.store(image_hash, lang, clean_output)
+                if not self.language_detector.language and self.language_detector.observe_text(clean_output):
+                    log_message(f"Spielsprache erkannt: {self.language_detector.language}, OCR nur noch damit")
             
-            try:
-                with open("last_recognized_text.txt", "w", encoding="utf-8") as f:
-                    f.write("--- RAW TESSERACT OUTPUT ---\n")
-                    f.write(raw_text)
-                    f.write("\n\n--- FILTERED OUTPUT (SEND TO AI) ---\n")
-                    f.write(clean_output)
-            except: pass
+            self.diagnostics.record(frame=img, crop=optimized_img, binarized=binarized,
+                                    raw_text=raw_text, clean_text=clean_output, timings=dict(self.last_timings))
             
             return clean_output
         except Exception as e:
             log_message(f"OCR Fehler: {e}")
+            self.diagnostics.record(frame=img, crop=optimized_img, binarized=binarized,
+                                    raw_text=raw_text, timings=dict(self.last_timings), error=repr(e))
+            self.diagnostics.flush_async("Fehler")
             return ""
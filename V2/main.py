@@ -1,10 +1,12 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, scrolledtext
 import threading
+import multiprocessing
 import time
 import os
 import keyboard
 from engine import VoiceEngine
+import block_ocr
 from utils import save_config, log_message
 
 # --- LOTRO FARBPALETTE ---
@@ -35,6 +37,7 @@ class LotroApp:
         self.engine = VoiceEngine()
         self.running = False
         self.hotkey_hook = None
+        self.diagnostic_hotkey_hook = None
 
         # Custom Notebook (Tabs)
         self.notebook = ttk.Notebook(root)
@@ -133,6 +136,8 @@ class LotroApp:
         self.btn_action = self.create_lotro_button(container, "🔊 JETZT Scannen & Vorlesen", self.run_once_manual)
         self.btn_action.pack(fill="x", pady=20, ipady=5)
 
+        self.create_lotro_button(container, "🩺 Diagnose speichern", self.save_diagnostics).pack(fill="x", pady=(0, 10))
+
         # Text Vorschau
         ttk.Label(container, text="Erkannter Quest-Text:", foreground=COLOR_TEXT_GOLD).pack(anchor="w", pady=(10, 5))
         
@@ -236,10 +241,26 @@ class LotroApp:
             except: pass
         try:
             # Hotkey startet den manuellen Scan
-            self.hotkey_hook = keyboard.add_hotkey(hk, lambda: self.root.after(0, self.run_once_manual))
+            self.hotkey_hook = keyboard.add_hotkey(hk, lambda: self.root.after(0, self.run_once_hotkey))
             self.log(f"Hotkey aktiviert ({hk})")
         except: self.log("Hotkey Fehler")
 
+        diag_hk = self.engine.config.get("diagnostic_hotkey", "ctrl+alt+d")
+        if self.diagnostic_hotkey_hook:
+            try: keyboard.remove_hotkey(self.diagnostic_hotkey_hook)
+            except: pass
+        try:
+            self.diagnostic_hotkey_hook = keyboard.add_hotkey(diag_hk, lambda: self.root.after(0, self.save_diagnostics))
+            self.log(f"Diagnose-Hotkey aktiviert ({diag_hk})")
+        except: self.log("Diagnose-Hotkey Fehler")
+
+    def save_diagnostics(self):
+        """ Schreibt die letzten Scans (Bilder und Texte) im Hintergrund nach Diagnostics/ """
+        if self.engine.diagnostics.flush_async():
+            self.log("Diagnose wird gespeichert...")
+        else:
+            self.log("Diagnose: Noch keine Scans vorhanden.")
+
     def refresh_mapping(self):
         for i in self.tree.get_children(): self.tree.delete(i)
         from utils import load_mapping
@@ -251,9 +272,14 @@ class LotroApp:
         """ Scannt und liest vor (Einmalig) """
         self.lbl_status.config(text="Status: Scanne...", fg=COLOR_TEXT_GOLD)
         self.log("Manueller Start...")
-        threading.Thread(target=self.process_pipeline, daemon=True).start()
+        threading.Thread(target=self.process_pipeline, args=(True,), daemon=True).start()
 
-    def process_pipeline(self):
+    def run_once_hotkey(self):
+        """ Scan per Hotkey im Spiel: schon vorgelesene Seiten (Zurückblättern) werden übersprungen """
+        self.lbl_status.config(text="Status: Scanne...", fg=COLOR_TEXT_GOLD)
+        threading.Thread(target=self.process_pipeline, args=(False,), daemon=True).start()
+
+    def process_pipeline(self, manual=False):
         try:
             # 1. OCR Scan
             txt = self.engine.run_ocr()
@@ -264,6 +290,12 @@ class LotroApp:
                 return
 
             self.log(f"Erkannt: {txt[:40]}...")
+
+            # Beim Zurückblättern auf eine schon gehörte Seite nicht erneut vorlesen (Knopf liest immer vor)
+            if not manual and not self.engine.is_new_text(txt):
+                self.log("Text wurde gerade schon vorgelesen.")
+                self.lbl_status.config(text="Status: Schon vorgelesen (Bereit)", fg="#4caf50")
+                return
             
             # GUI Update
             self.txt_preview.config(state="normal")
@@ -273,7 +305,8 @@ class LotroApp:
             
             # 2. Audio generieren
             self.lbl_status.config(text="Status: Generiere Audio...", fg="#4facfe")
-            self.engine.generate_and_play(txt, "Unknown")
+            # Erst nach erfolgreicher Wiedergabe merken, nach einem API-Fehler darf erneut gescannt werden
+            self.engine.generate_and_play(txt, "Unknown", on_played=lambda: self.engine.remember_spoken(txt))
             
             self.lbl_status.config(text="Status: Fertig (Bereit)", fg="#4caf50")
             
@@ -282,6 +315,12 @@ class LotroApp:
             self.lbl_status.config(text="Status: Fehler", fg=COLOR_ACCENT)
 
 if __name__ == "__main__":
+    # Nötig für den OCR-Prozesspool in der gepackten EXE
+    multiprocessing.freeze_support()
     root = tk.Tk()
     app = LotroApp(root)
-    root.mainloop()
+    try:
+        root.mainloop()
+    finally:
+        # OCR-Worker beenden, sonst laufen die Prozesse nach dem Schließen des Fensters weiter
+        block_ocr.shutdown_pool()
@@ -0,0 +1,105 @@
+import numpy as np
+
+# Inkrementelles OCR beim Scrollen: Wird ein langer Quest-Text gescrollt, ist der Großteil
+# der Zeilen schon bekannt. Hier wird die vertikale Verschiebung zwischen dem vorherigen und
+# dem aktuellen (binarisierten) Bild gesucht, damit nur die neu sichtbaren Zeilen gelesen
+# und an den bisherigen Text angehängt werden müssen.
+# Verglichen werden die Dialogrechtecke vor dem Zuschnitt auf den Inhalt, an ihrer Position auf
+# dem Bildschirm ausgerichtet: Beim Scrollen ändert sich die Größe des Inhalts und oft auch die
+# des gefundenen Rechtecks, der Text bleibt aber an derselben Stelle des Bildschirms.
+
+# Mindestens dieser Anteil der Bildhöhe muss sich überlappen
+MIN_OVERLAP_RATIO = 0.3
+# Höchstens dieser Anteil unterschiedlicher Pixel im Überlappungsbereich
+MAX_PIXEL_DIFF = 0.01
+
+
+def align_regions(prev, prev_origin, cur, cur_origin):
+    """
+    Legt beide Bilder an ihrer Bildschirmposition (x, y der linken oberen Ecke) auf gleich große,
+    schwarze Flächen. Gibt (prev_canvas, cur_canvas, Position von cur auf der Fläche) zurück.
+    """
+    x1 = min(prev_origin[0], cur_origin[0])
+    y1 = min(prev_origin[1], cur_origin[1])
+    x2 = max(prev_origin[0] + prev.shape[1], cur_origin[0] + cur.shape[1])
+    y2 = max(prev_origin[1] + prev.shape[0], cur_origin[1] + cur.shape[0])
+
+    canvases = []
+    for img, (x, y) in ((prev, prev_origin), (cur, cur_origin)):
+        canvas = np.zeros((y2 - y1, x2 - x1), dtype=img.dtype)
+        canvas[y - y1:y - y1 + img.shape[0], x - x1:x - x1 + img.shape[1]] = img
+        canvases.append(canvas)
+
+    return canvases[0], canvases[1], (cur_origin[0] - x1, cur_origin[1] - y1)
+
+
+def find_scroll_offset(prev, cur):
+    """
+    Gibt dy zurück, wenn cur dem um dy Pixel nach oben geschobenen prev entspricht
+    (dy = 0: unverändert), sonst None.
+    """
+    if prev is None or prev.shape != cur.shape:
+        return None
+
+    h = cur.shape[0]
+    min_overlap = max(1, int(h * MIN_OVERLAP_RATIO))
+
+    # Grobe Suche über die Zeilenprofile (weiße Pixel pro Zeile), dann Pixelvergleich
+    prev_profile = np.count_nonzero(prev, axis=1).astype(np.int32)
+    cur_profile = np.count_nonzero(cur, axis=1).astype(np.int32)
+
+    candidates = []
+    for dy in range(0, h - min_overlap + 1):
+        diff = np.abs(cur_profile[:h - dy] - prev_profile[dy:]).mean()
+        candidates.append((diff, dy))
+    candidates.sort()
+
+    for _, dy in candidates[:3]:
+        overlap_cur = cur[:h - dy]
+        overlap_prev = prev[dy:]
+        changed = np.count_nonzero(overlap_cur != overlap_prev) / overlap_cur.size
+        if changed <= MAX_PIXEL_DIFF:
+            return dy
+
+    return None
+
+
+def new_rows_start(binarized, dy):
+    """ Erste Zeile des neuen Bereichs, nach oben bis zur nächsten Lücke zwischen Textzeilen verschoben. """
+    h = binarized.shape[0]
+    start = h - dy
+    profile = np.count_nonzero(binarized[:start], axis=1)
+    blank_rows = np.flatnonzero(profile == 0)
+    if len(blank_rows) == 0:
+        return 0
+    return int(blank_rows[-1])
+
+
+def _normalize(line):
+    return "".join(ch for ch in line.lower() if ch.isalnum())
+
+
+def is_cut_off(binarized):
+    """ True, wenn die unterste Pixelzeile Text enthält, die letzte Textzeile also abgeschnitten ist. """
+    return bool(np.count_nonzero(binarized[-1]))
+
+
+def stitch(prev_text, new_text, prev_cut_off=False):
+    """ Hängt new_text an prev_text an, doppelt gelesene Zeilen am Übergang werden verworfen. """
+    prev_lines = [l for l in prev_text.split("\n") if l.strip()]
+    new_lines = [l for l in new_text.split("\n") if l.strip()]
+
+    # Die abgeschnittene letzte Zeile steckt vollständig im neuen Bereich
+    if prev_cut_off and prev_lines:
+        prev_lines.pop()
+
+    prev_keys = [_normalize(l) for l in prev_lines]
+    new_keys = [_normalize(l) for l in new_lines]
+
+    overlap = 0
+    for k in range(min(len(prev_keys), len(new_keys)), 0, -1):
+        if prev_keys[-k:] == new_keys[:k]:
+            overlap = k
+            break
+
+    return "\n".join(prev_lines + new_lines[overlap:])
@@ -13,7 +13,18 @@ DEFAULT_CONFIG = {
     "ocr_coords": None, # None bedeutet: Ganzer Monitor wird gescannt
     "hotkey": "ctrl+alt+s",
     "monitor_index": 1, # 1 = Hauptmonitor
-    "audio_delay": 0.5  # Sekunden Pause vor Sprachausgabe
+    "audio_delay": 0.5,  # Sekunden Pause vor Sprachausgabe
+    "parallel_ocr": True,  # Lange Texte blockweise in mehreren Prozessen lesen
+    "diagnostic_hotkey": "ctrl+alt+d",  # Speichert die letzten Scans in den Ordner Diagnostics
+    "diagnostic_scans": 5,  # Anzahl Scans, die im Speicher gehalten werden
+    "diagnostic_frame_scale": 0.25,  # Screenshot der Scans verkleinert halten, 1.0 = volle Auflösung, 0 = keiner
+    # Vorverarbeitung: genauer (Standard) oder schneller für schwache Rechner
+    "detection_scale": 1.0,  # z.B. 0.5: Dialogsuche auf halber Auflösung
+    "crop_method": "reduce",  # "reduce" (Zeilen-/Spaltenmaxima) oder "findnonzero"
+    "ocr_languages": "deu+eng",  # Mögliche Spielsprachen; die tatsächliche wird pro Sitzung erkannt
+    "ocr_min_confidence": 55,  # Mittlere Wort-Konfidenz (0-100), darunter wird der Text verworfen
+    "ocr_min_word_ratio": 0.5,  # Mindestanteil echter Wörter, 0 schaltet die Prüfung ab
+    "dedup_window_minutes": 10  # So lange wird ein schon vorgelesener Text nicht wiederholt (0 = aus)
 }
 
 def load_config():
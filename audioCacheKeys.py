@@ -0,0 +1,249 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import unicodedata
+from collections import Counter
+
+# Cache keys for generated audio that survive OCR jitter. The same quest text read twice by
+# Tesseract often differs by a stray character, a missing comma or "l" instead of "I", which
+# used to force a new (paid) synthesis. The key is built from a canonical fingerprint of the
+# text, and a lookup also accepts cached texts within a small edit distance.
+# The voice is part of the key: the same sentence said by another NPC is another audio.
+# A near match must have the same numbers: "bring me 8 pelts" is not the audio of "bring me 5 pelts".
+
+index_filename = "audio_index.json"
+
+# Characters Tesseract confuses in the LOTRO font, mapped to one representative.
+ocr_confusions = [("rn", "m"), ("vv", "w"), ("0", "o"), ("1", "l"), ("i", "l"), ("|", "l")]
+
+_not_alphanumeric = re.compile(r"[\W_]+")
+_number = re.compile(r"\d+")
+
+# Allowed edits: 2 % of the text length, at least 1 and at most 8.
+max_edit_ratio = 0.02
+max_edits_limit = 8
+
+# Shorter texts (single sentences of streamed audio) only match exactly, "go" is not "no".
+min_fuzzy_length = 20
+
+
+def first_words_name(text):
+    """ File name used before the fingerprint keys (first five words), still looked up for old audios. """
+    words = text.split()
+
+    if not words:
+        return "unknown_audio"
+
+    return re.sub(r'[^a-zA-Z0-9]', '', "".join(words[:5]).lower())
+
+
+def fingerprint(text):
+    """ Lower case, no accents, punctuation or whitespace, OCR confusions unified. """
+    text = unicodedata.normalize("NFKD", text.lower())
+    text = "".join(char for char in text if not unicodedata.combining(char))
+
+    for old, new in ocr_confusions:
+        text = text.replace(old, new)
+
+    return _not_alphanumeric.sub("", text)
+
+
+def numbers_of(text):
+    """ The numbers of the text in order, e.g. ["5", "20"]. """
+    return _number.findall(text)
+
+
+def key_for(fingerprint_text, voice=""):
+    if voice:
+        fingerprint_text = f"{voice}\0{fingerprint_text}"
+
+    return hashlib.blake2b(fingerprint_text.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def allowed_edits(length):
+    return max(1, min(max_edits_limit, int(length * max_edit_ratio)))
+
+
+def bounded_edit_distance(a, b, limit):
+    """ Levenshtein distance, or None as soon as it is certainly larger than limit. """
+    if abs(len(a) - len(b)) > limit:
+        return None
+
+    previous = list(range(len(b) + 1))
+
+    for i, char_a in enumerate(a, 1):
+        # Only the diagonal band of width 2*limit+1 can stay within the limit
+        low = max(1, i - limit)
+        high = min(len(b), i + limit)
+
+        current = [limit + 1] * (len(b) + 1)
+        current[0] = i if i <= limit else limit + 1
+
+        for j in range(low, high + 1):
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != b[j - 1]))
+
+        if min(current[max(0, low - 1):high + 1]) > limit:
+            return None
+
+        previous = current
+
+    return previous[-1] if previous[-1] <= limit else None
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_index(directory):
+    with _indexes_lock:
+        index = _indexes.get(directory)
+
+        if index is None:
+            index = AudioCacheIndex(directory)
+            _indexes[directory] = index
+
+        return index
+
+
+def find_legacy_audio(directory, text, voice=""):
+    """ Cached audio for the text in this voice: fingerprint index first, then the old first-five-words file. """
+    cached = get_index(directory).lookup(text, voice) if text else None
+
+    if cached is None:
+        old_file = directory + "/" + first_words_name(text) + ".mp3"
+
+        if os.path.exists(old_file):
+            cached = old_file
+
+    return cached
+
+
+def new_legacy_audio_file(directory, text, voice=""):
+    """ Readable name plus fingerprint key, so texts with the same first words no longer collide. """
+    return directory + "/" + first_words_name(text) + "_" + key_for(fingerprint(text), voice) + ".mp3"
+
+
+class AudioCacheIndex:
+    """ (voice, fingerprint) -> audio file, stored as JSON in the audio folder. """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.path = os.path.join(directory, index_filename)
+        self.entries = {}
+        self._histograms = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.near_hits = 0
+        self.misses = 0
+
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as file:
+                self.entries = json.load(file)
+        except (FileNotFoundError, ValueError):
+            self.entries = {}
+
+    def save(self):
+        try:
+            if not os.path.exists(self.directory):
+                os.makedirs(self.directory)
+
+            temp_path = self.path + ".tmp"
+
+            with open(temp_path, "w", encoding="utf-8") as file:
+                json.dump(self.entries, file, ensure_ascii=False)
+
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            print(f"Could not save audio cache index: {e}")
+
+    def file_path(self, entry):
+        return os.path.join(self.directory, entry["file"])
+
+    def histogram(self, fingerprint_text):
+        histogram = self._histograms.get(fingerprint_text)
+
+        if histogram is None:
+            histogram = Counter(fingerprint_text)
+            self._histograms[fingerprint_text] = histogram
+
+        return histogram
+
+    def lookup(self, text, voice=""):
+        """ Path of cached audio for this text (or a text within a few OCR errors of it) in this voice, else None. """
+        wanted = fingerprint(text)
+
+        if not wanted:
+            return None
+
+        with self._lock:
+            entry = self.entries.get(key_for(wanted, voice))
+
+            if entry is not None and os.path.exists(self.file_path(entry)):
+                self.hits += 1
+                return self.file_path(entry)
+
+            if len(wanted) < min_fuzzy_length:
+                self.misses += 1
+                return None
+
+            limit = allowed_edits(len(wanted))
+            wanted_numbers = numbers_of(text)
+            wanted_histogram = None
+            best = None
+
+            for key, entry in list(self.entries.items()):
+                candidate = entry["fingerprint"]
+
+                if entry.get("voice", "") != voice or abs(len(candidate) - len(wanted)) > limit:
+                    continue
+
+                # Edits are only allowed outside numbers, a changed amount is never "the same text".
+                # Entries without numbers (older index) only match texts without digits.
+                if entry.get("numbers", []) != wanted_numbers or ("numbers" not in entry and _number.search(wanted)):
+                    continue
+
+                # Every edit changes the letter counts by at most 2, a cheap filter before the real distance
+                if wanted_histogram is None:
+                    wanted_histogram = Counter(wanted)
+
+                difference = self.histogram(candidate).copy()
+                difference.subtract(wanted_histogram)
+
+                if sum(abs(count) for count in difference.values()) > 2 * limit:
+                    continue
+
+                distance = bounded_edit_distance(wanted, candidate, limit)
+
+                if distance is not None and (best is None or distance < best[0]):
+                    if not os.path.exists(self.file_path(entry)):
+                        # Audio was deleted (e.g. cache cleanup), forget the entry
+                        del self.entries[key]
+                        continue
+
+                    best = (distance, entry)
+
+            if best is None:
+                self.misses += 1
+                return None
+
+            self.near_hits += 1
+            return self.file_path(best[1])
+
+    def filename_for(self, text, prefix="", voice=""):
+        return f"{prefix}{key_for(fingerprint(text), voice)}.mp3"
+
+    def add(self, text, filename, voice=""):
+        wanted = fingerprint(text)
+
+        if not wanted:
+            return
+
+        with self._lock:
+            self.entries[key_for(wanted, voice)] = {"fingerprint": wanted, "voice": voice, "numbers": numbers_of(text),
+                                                    "file": filename}
+            self.save()
@@ -1,18 +1,25 @@
 # This file only exist, so I can clean the most common misread from Tesseract due LOTRO font.
 
-import re
 import os
 import globalVariables
+import textNormalizer
 
+normalizer = None
 
-def clear(text):
-    text = text.replace('\n', ' ')
 
-    text = replace_strings(text)
+def get_normalizer():
+    # replace_string.txt is parsed again only when it was changed
+    global normalizer
+
+    if normalizer is None:
+        create_replace_string_file()
+        normalizer = textNormalizer.TextNormalizer(globalVariables.config_path + r"/replace_string.txt")
 
-    text_without_double_spaces = re.sub(r'\s+', ' ', text)
+    return normalizer
 
-    return re.sub(r'[^a-zA-Z0-9!?.;,:\-\'\"äöüßàâçéèêëîïôûùÿæœÀÂÇÉÈÊËÎÏÔÛÙÜŸÆŒ ]', '', text_without_double_spaces)
+
+def clear(text):
+    return get_normalizer().normalize(text)
 
 
 def create_replace_string_file():
@@ -27,21 +34,4 @@ def create_replace_string_file():
 
 
 def replace_strings(input_string):
-    create_replace_string_file()
-
-    file_path = globalVariables.config_path + r"/replace_string.txt"
-
-    replacements = {}
-    with open(file_path, 'r', encoding='utf-8') as file:
-        for line in file:
-            parts = line.strip().split(',')
-            if len(parts) == 2:
-                old_str, new_str = parts[0], parts[1]
-                if new_str == '""':
-                    new_str = ''
-                replacements[old_str] = new_str
-
-    for old_str, new_str in replacements.items():
-        input_string = input_string.replace(old_str, new_str)
-
-    return input_string
+    return get_normalizer().replace(input_string)
@@ -0,0 +1,82 @@
+import re
+import threading
+import npcIndex
+
+# Detects the language of the LOTRO client once per session, so Tesseract can run with a single
+# language model instead of several ("deu+eng" costs noticeably more than "deu").
+# Two sources vote for a language:
+#   - the quest texts already read (frequent short words of each language)
+#   - the NPC names of the plugin, looked up in the NPC name files of each language
+# Once one language is clearly ahead, the result is kept for the rest of the session.
+
+stopwords = {
+    "eng": {"the", "and", "you", "to", "of", "is", "that", "it", "for", "have", "with", "was", "are", "this",
+            "not", "your", "but", "be", "we", "my"},
+    "deu": {"und", "der", "die", "das", "ich", "nicht", "ist", "du", "sie", "ein", "zu", "mit", "es", "den",
+            "auf", "wir", "mir", "dich", "auch", "aber"},
+    "fra": {"le", "la", "les", "et", "vous", "je", "de", "des", "est", "une", "pas", "que", "qui", "pour",
+            "dans", "nous", "il", "ne", "du", "mais"},
+}
+
+# A name that exists in only some of the languages counts as much as this many words.
+npc_vote_weight = 5
+
+# The leading language needs at least this score and this lead factor over the second one.
+min_score = 20
+min_lead = 2.0
+
+word_pattern = re.compile(r"[^\W\d_]+")
+
+
+class ClientLanguageDetector:
+    def __init__(self, candidates=("eng", "deu", "fra"), directory=npcIndex.npc_directory):
+        self.candidates = tuple(lang for lang in candidates if lang in stopwords)
+        self.directory = directory
+        self.scores = dict.fromkeys(self.candidates, 0)
+        self.language = self.candidates[0] if len(self.candidates) == 1 else None
+        self._lock = threading.Lock()
+
+    def ocr_language(self, fallback):
+        """ The detected language, or the fallback (e.g. "deu+eng") while it is still unknown. """
+        return self.language or fallback
+
+    def observe_text(self, text):
+        if self.language is not None or not text:
+            return self.language
+
+        words = word_pattern.findall(text.lower())
+
+        with self._lock:
+            for lang in self.candidates:
+                self.scores[lang] += sum(1 for word in words if word in stopwords[lang])
+
+        return self.decide()
+
+    def observe_npc(self, name):
+        if self.language is not None or not name or name == "Unknown":
+            return self.language
+
+        matches = [lang for lang in npcIndex.get_index(self.directory).languages_of(name) if lang in self.candidates]
+
+        # Names like "Gandalf" exist in every language and tell nothing
+        if matches and len(matches) < len(self.candidates):
+            with self._lock:
+                for lang in matches:
+                    self.scores[lang] += npc_vote_weight
+
+        return self.decide()
+
+    def decide(self):
+        with self._lock:
+            if self.language is not None or not self.candidates:
+                return self.language
+
+            ranked = sorted(self.scores.items(), key=lambda item: item[1], reverse=True)
+            best_lang, best = ranked[0]
+            second = ranked[1][1] if len(ranked) > 1 else 0
+
+            if best >= min_score and best >= second * min_lead:
+                self.language = best_lang
+                print(f"Client language detected: {best_lang} (scores {self.scores})")
+
+        return self.language
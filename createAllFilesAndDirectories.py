@@ -4,6 +4,8 @@ import retriveSaveNPCsVoices
 import getVoicesFromFile
 import isQuestWindowOpen
 import cleanText
+import pollingScheduler
+import ocrQualityGate
 
 
 # Just to make sure.
@@ -17,3 +19,5 @@ def create():
     getVoicesFromFile.create_voices_path_files()
     isQuestWindowOpen.create_images_directory()
     cleanText.create_replace_string_file()
+    pollingScheduler.create_cpu_budget_file()
+    ocrQualityGate.create_min_confidence_file()
@@ -0,0 +1,83 @@
+import os
+import threading
+from collections import namedtuple
+import cv2
+import globalVariables
+
+# Templates are decoded once and kept in memory in the color spaces the matcher works in
+# (BGR and grayscale), so the detection loop never touches the disk. They are reloaded only
+# when the modification time of one of the template directories changes (file added,
+# removed or renamed).
+
+default_image_directory = r"Resources/Images"
+
+image_extensions = ('.png', '.jpg', '.jpeg')
+
+Template = namedtuple("Template", ["name", "path", "bgr", "gray"])
+
+_lock = threading.Lock()
+_templates = []
+_signature = None
+
+# Incremented on every reload, so callers can drop anything derived from the old templates.
+generation = 0
+
+
+def directory_mtime(directory):
+    try:
+        return os.stat(directory).st_mtime_ns
+    except OSError:
+        return None
+
+
+def list_image_files(directory):
+    try:
+        filenames = sorted(os.listdir(directory))
+    except OSError:
+        return []
+
+    return [os.path.join(directory, filename) for filename in filenames
+            if filename.lower().endswith(image_extensions)]
+
+
+def load_templates():
+    # User images in the Detection folder replace the default ones completely.
+    image_files = list_image_files(globalVariables.image_detection_path)
+
+    if not image_files:
+        image_files = list_image_files(default_image_directory)
+
+    templates = []
+
+    for image_path in image_files:
+        image = cv2.imread(image_path, cv2.IMREAD_COLOR)
+
+        if image is None:
+            print(f"Could not read detection image: {image_path}")
+            continue
+
+        templates.append(Template(os.path.basename(image_path), image_path, image,
+                                  cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)))
+
+    return templates
+
+
+def get_templates():
+    global _templates, _signature, generation
+
+    signature = (directory_mtime(globalVariables.image_detection_path),
+                 directory_mtime(default_image_directory))
+
+    if signature == _signature:
+        return _templates
+
+    with _lock:
+        if signature != _signature:
+            _templates = load_templates()
+            _signature = signature
+            generation += 1
+
+            print(f"Loaded {len(_templates)} detection image(s).")
+
+    return _templates
+
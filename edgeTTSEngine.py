@@ -1,13 +1,17 @@
 import pygame
 import os
+import asyncio
 import edge_tts
-import re
 import globalVariables
+import audioCacheKeys
+import streamingPlayback
 import setVoiceByGender
 from tkinter import messagebox
 
 
 def stop_audio():
+    streamingPlayback.stop()
+
     pygame.mixer.music.stop()
 
     pygame.mixer.music.unload()
@@ -23,30 +27,49 @@ def play_audio(audio):
     pygame.mixer.music.unload()
 
 
+def synthesize_chunk(chunk, voice):
+    """ Runs in a worker thread of streamingPlayback, every chunk is cached on its own. """
+    cached_file = audioCacheKeys.find_legacy_audio(globalVariables.audio_path_string, chunk, voice)
+
+    if cached_file:
+        return cached_file
+
+    audio_file = audioCacheKeys.new_legacy_audio_file(globalVariables.audio_path_string, chunk, voice)
+
+    asyncio.run(edge_tts.Communicate(chunk, voice).save(audio_file))
+
+    audioCacheKeys.get_index(globalVariables.audio_path_string).add(chunk, os.path.basename(audio_file), voice)
+
+    return audio_file
+
+
 async def tts_engine(text, test=False) -> None:
     if not os.path.exists(globalVariables.audio_path_string):
         os.makedirs(globalVariables.audio_path_string)
 
-    words = text.split()
-    first_5_words = "".join(words[:5]).lower()
-    first_5_words = re.sub(r'[^a-zA-Z0-9]', '', first_5_words)
-    audio_file = globalVariables.audio_path_string + "/" + first_5_words + ".mp3"
-
     if globalVariables.already_talked and not test:
         return
 
-    if os.path.exists(audio_file):
-        play_audio(audio_file)
+    try:
+        voice = setVoiceByGender.set_voice("edge-tts")
+    except Exception as e:
+        messagebox.showerror("Error", str(e))
+        globalVariables.already_talked = True
+        return
+
+    # Also finds audio of the same text read with a few OCR errors, only in the voice of this NPC
+    cached_file = audioCacheKeys.find_legacy_audio(globalVariables.audio_path_string, text, voice)
+
+    if cached_file:
+        play_audio(cached_file)
     else:
         if text:
             try:
-                voice = setVoiceByGender.set_voice("edge-tts")
-
-                communicate = edge_tts.Communicate(text, voice)
-
-                await communicate.save(audio_file)
+                # Sentence by sentence: playback starts after the first one, the others are synthesized meanwhile
+                chunks = streamingPlayback.split_chunks(text)
 
-                play_audio(audio_file)
+                await asyncio.to_thread(streamingPlayback.play_stream, chunks,
+                                        lambda chunk: synthesize_chunk(chunk, voice))
             except Exception as e:
                 messagebox.showerror("Error", str(e))
 
@@ -1,7 +1,8 @@
 import pygame
 import os
-import re
 import globalVariables
+import audioCacheKeys
+import streamingPlayback
 from elevenlabs import save
 from elevenlabs.client import ElevenLabs
 import time
@@ -10,6 +11,7 @@ import setVoiceByGender
 import elevenlabs_manager  # NEU: Import für die Zuweisungs-Logik
 
 def stop_audio():
+    streamingPlayback.stop()
     pygame.mixer.music.stop()
     pygame.mixer.music.unload()
 
@@ -24,6 +26,60 @@ def play_audio(audio):
     pygame.mixer.music.unload()
 
 
+def synthesize_chunk(client, voice, model, chunk):
+    """ Runs in a worker thread of streamingPlayback, every chunk is cached on its own. """
+    cached_file = audioCacheKeys.find_legacy_audio(globalVariables.audio_path_string, chunk, voice)
+
+    if cached_file:
+        return cached_file
+
+    audio = client.text_to_speech.convert(
+        voice_id=voice,
+        text=chunk,
+        model_id=model,
+        output_format="mp3_44100_128"
+    )
+
+    audio_file = audioCacheKeys.new_legacy_audio_file(globalVariables.audio_path_string, chunk, voice)
+
+    save(audio, audio_file)
+
+    audioCacheKeys.get_index(globalVariables.audio_path_string).add(chunk, os.path.basename(audio_file), voice)
+
+    return audio_file
+
+
+def choose_voice(test=False):
+    # --- NEUE LOGIK START ---
+    voice = None
+
+    # Versuche, eine dynamische Stimme zu finden, wenn wir nicht im Test-Modus sind
+    # und der Pool geladen wurde.
+    if hasattr(globalVariables, 'voice_pool') and globalVariables.voice_pool and not test:
+        # Hole NPC Infos sicherheitshalber mit getattr, falls sie leer sind
+        npc_name = getattr(globalVariables, 'npc_name', '')
+        npc_gender = getattr(globalVariables, 'npc_gender', '')
+
+        print(f"Suche Stimme für NPC: '{npc_name}' ({npc_gender})")
+
+        voice = elevenlabs_manager.get_voice_for_npc(
+            npc_name,
+            npc_gender,
+            globalVariables.voice_pool
+        )
+
+    # Fallback: Wenn keine dynamische Stimme gefunden wurde (oder wir im Test sind),
+    # nutze die alte Standard-Logik
+    if not voice:
+        print("Nutze Standard-Stimme (Fallback).")
+        voice = setVoiceByGender.set_voice("elevenlabs")
+    else:
+        print(f"Dynamische Stimme angewendet: {voice}")
+    # --- NEUE LOGIK ENDE ---
+
+    return voice
+
+
 def tts_engine(text, test=False):
     create_api_key_file()
     create_elevenlabs_model_file()
@@ -31,26 +87,26 @@ def tts_engine(text, test=False):
     if not os.path.exists(globalVariables.audio_path_string):
         os.makedirs(globalVariables.audio_path_string)
 
-    words = text.split()
+    if globalVariables.already_talked and not test:
+        return
 
-    # Create a simple filename from first few words
-    if len(words) > 0:
-        first_5_words = "".join(words[:5]).lower()
-        first_5_words = re.sub(r'[^a-zA-Z0-9]', '', first_5_words)
-    else:
-        first_5_words = "unknown_audio"
+    try:
+        # Before the cache lookup: cached audio is only valid in the voice of this NPC
+        voice = choose_voice(test)
+    except Exception as e:
+        messagebox.showerror("Error", str(e))
+        globalVariables.already_talked = True
+        return
 
-    audio_file = globalVariables.audio_path_string + "/" + first_5_words + ".mp3"
+    # Also finds audio of the same text read with a few OCR errors
+    cached_file = audioCacheKeys.find_legacy_audio(globalVariables.audio_path_string, text, voice)
 
     key = load_api_key()
 
     model = load_elevenlabs_model()
 
-    if globalVariables.already_talked and not test:
-        return
-
-    if os.path.exists(audio_file):
-        play_audio(audio_file)
+    if cached_file:
+        play_audio(cached_file)
     else:
         if text:
             if key:
@@ -59,48 +115,15 @@ def tts_engine(text, test=False):
                         api_key=key,
                     )
 
-                    # --- NEUE LOGIK START ---
-                    voice = None
-                    
-                    # Versuche, eine dynamische Stimme zu finden, wenn wir nicht im Test-Modus sind
-                    # und der Pool geladen wurde.
-                    if hasattr(globalVariables, 'voice_pool') and globalVariables.voice_pool and not test:
-                        # Hole NPC Infos sicherheitshalber mit getattr, falls sie leer sind
-                        npc_name = getattr(globalVariables, 'npc_name', '')
-                        npc_gender = getattr(globalVariables, 'npc_gender', '')
-                        
-                        print(f"Suche Stimme für NPC: '{npc_name}' ({npc_gender})")
-                        
-                        voice = elevenlabs_manager.get_voice_for_npc(
-                            npc_name, 
-                            npc_gender, 
-                            globalVariables.voice_pool
-                        )
-                    
-                    # Fallback: Wenn keine dynamische Stimme gefunden wurde (oder wir im Test sind),
-                    # nutze die alte Standard-Logik
-                    if not voice:
-                        print("Nutze Standard-Stimme (Fallback).")
-                        voice = setVoiceByGender.set_voice("elevenlabs")
-                    else:
-                        print(f"Dynamische Stimme angewendet: {voice}")
-                    # --- NEUE LOGIK ENDE ---
-
                     if model:
                         set_model = model
                     else:
                         set_model = "eleven_turbo_v2_5"
 
-                    audio = client.text_to_speech.convert(
-                        voice_id=voice,
-                        text=text,
-                        model_id=set_model,
-                        output_format="mp3_44100_128"
-                    )
-
-                    save(audio, audio_file)
+                    # Sentence by sentence: playback starts after the first one, the others are synthesized meanwhile
+                    chunks = streamingPlayback.split_chunks(text)
 
-                    play_audio(audio_file)
+                    streamingPlayback.play_stream(chunks, lambda chunk: synthesize_chunk(client, voice, set_model, chunk))
 
                 except Exception as e:
                     messagebox.showerror("Error", str(e))
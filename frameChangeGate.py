@@ -0,0 +1,87 @@
+import hashlib
+import cv2
+
+# Cheap change detector in front of detection and OCR. The OCR rectangle and the regions
+# where the detection images were last found are downsampled, quantized and hashed. When
+# the hash equals the one of the previous cycle, the screen did not change in a way that
+# matters and the previous result is reused.
+
+thumbnail_width = 64
+
+# Gray levels are reduced to 16 steps, so small flicker does not count as a change.
+quantization_shift = 4
+
+gate_stats = {
+    "cycles": 0,
+    "skipped": 0,
+}
+
+_last_signature = None
+_last_result = False
+
+
+def region_thumbnail(gray, x1, y1, x2, y2):
+    region = gray[max(0, y1):max(0, y2), max(0, x1):max(0, x2)]
+
+    if region.size == 0:
+        return b""
+
+    height, width = region.shape[:2]
+    thumb_width = min(thumbnail_width, width)
+    thumb_height = max(1, min(height, round(height * thumb_width / width)))
+
+    thumbnail = cv2.resize(region, (thumb_width, thumb_height), interpolation=cv2.INTER_AREA)
+
+    return (thumbnail >> quantization_shift).tobytes()
+
+
+def frame_signature(frame, ocr_bbox, template_regions):
+    """
+    ocr_bbox: (start_x, start_y, end_x, end_y) of the OCR rectangle.
+    template_regions: list of (x, y, width, height) where the detection images were last found.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+
+    levels = frame.gray_pyramid()
+    gray = levels[0]
+
+    if template_regions:
+        for x, y, width, height in sorted(template_regions):
+            digest.update(region_thumbnail(gray, x, y, x + width, y + height))
+    else:
+        # Position of the quest window is unknown, look at the whole screen instead.
+        coarse = levels[-1]
+        digest.update(region_thumbnail(coarse, 0, 0, coarse.shape[1], coarse.shape[0]))
+
+    ocr_bbox = frame.clip_bbox(*ocr_bbox)
+    digest.update(repr(ocr_bbox).encode())
+    digest.update(region_thumbnail(gray, *ocr_bbox))
+
+    return digest.digest()
+
+
+def is_unchanged(signature):
+    gate_stats["cycles"] += 1
+
+    if _last_signature is not None and signature == _last_signature:
+        gate_stats["skipped"] += 1
+        return True
+
+    return False
+
+
+def last_result():
+    return _last_result
+
+
+def remember(signature, result):
+    global _last_signature, _last_result
+
+    _last_signature = signature
+    _last_result = result
+
+
+def reset():
+    global _last_signature
+
+    _last_signature = None
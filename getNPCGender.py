@@ -1,29 +1,24 @@
-file_path = "Resources/NPCs/npcs.txt"
+import npcIndex
 
+# Parsed once at startup, every lookup afterwards is a dictionary access
+npc_index = npcIndex.get_index()
 
-def find_npc_in_the_file(file_path, search_string, encoding="utf-8"):
-    try:
-        with open(file_path, "r", encoding=encoding) as file:
-            file_contents = file.read().split("\n")
 
-        search_string = search_string.lower()
+def resolve_npc(search_string, lang=None):
+    # lang: detected client language ("deu", ...), its NPC file is searched first.
+    # A slightly misspelled name is matched to the name in the file, so it keeps its voice.
+    found = npc_index.match(search_string, lang)
 
-        for line in file_contents:
-            if search_string in line.lower():
-                return line
+    if found is None:
+        return search_string, None
 
-        return None
-    except UnicodeDecodeError:
-        print(f"Unable to decode the file using {encoding} encoding.")
-        return None
+    name, codes, score = found
 
+    if score < 1.0:
+        print(f"NPC '{search_string}' matched to '{name}' (score {score:.2f})")
 
-def return_npc_gender(search_string):
-    result = find_npc_in_the_file(file_path, search_string)
+    return name, npcIndex.genders.get(codes)
 
-    if result is not None:
-        result_lower = result.lower()
-        if "[m]" in result_lower:
-            return "male"
-        if "[f]" in result_lower:
-            return "female"
+
+def return_npc_gender(search_string, lang=None):
+    return resolve_npc(search_string, lang)[1]
@@ -1,29 +1,54 @@
 import os
 from pathlib import Path
 import getNPCGender
+import scriptLogWatcher
 
 # Der Pfad zur Log-Datei des LOTRO Plugins. 
 # WICHTIG: Du musst das Plugin im Spiel installiert haben!
 file_path = str(Path.home() / 'Documents') + r"/The Lord of the Rings Online/Script.log"
 
-def get_npc_gender_by_name():
+log_watcher = None
+
+
+def start_log_watcher():
+    # Weckt die Überwachungsschleife, sobald das Plugin einen neuen NPC schreibt
+    global log_watcher
+
+    if log_watcher is None:
+        log_watcher = scriptLogWatcher.ScriptLogWatcher(file_path)
+        log_watcher.start()
+
+    return log_watcher
+
+
+def read_last_line():
+    # Der Watcher kennt die letzte Zeile schon, dann muss die Datei nicht neu gelesen werden
+    if log_watcher is not None and log_watcher.last_line is not None:
+        return log_watcher.last_line
+
+    with open(file_path, 'r', encoding='utf-8', errors='ignore') as file:
+        lines = file.readlines()
+
+    if lines:
+        return lines[-1].strip()
+
+    return None
+
+
+def get_npc_gender_by_name(lang=None):
     if os.path.exists(file_path):
         try:
-            # 'utf-8' mit 'ignore' verhindert Abstürze bei seltsamen Zeichen
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as file:
-                lines = file.readlines()
+            # Die letzte Zeile enthält den aktuellen NPC
+            last_line = read_last_line()
 
-                if lines:
-                    # Die letzte Zeile enthält den aktuellen NPC
-                    last_line = lines[-1].strip()
-                    
-                    # Hole das Geschlecht basierend auf dem Namen (via Datenbank/Logik)
-                    gender = getNPCGender.return_npc_gender(last_line)
-                    
-                    return str(gender), str(last_line)
-                else:
-                    # Datei ist leer
-                    return "Unknown", "Unknown"
+            if last_line:
+                # Hole das Geschlecht basierend auf dem Namen (via Datenbank/Logik)
+                name, gender = getNPCGender.resolve_npc(last_line, lang)
+
+                return str(gender), str(name)
+            else:
+                # Datei ist leer
+                return "Unknown", "Unknown"
                     
         except Exception as e:
             print(f"Fehler beim Lesen der Script.log: {e}")
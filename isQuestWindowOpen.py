@@ -1,42 +1,113 @@
 import os
-import cv2
-import numpy as np
-import pyautogui
+from concurrent.futures import ThreadPoolExecutor
 import globalVariables
+import detectionTemplates
+import pyramidMatcher
+import screenCapture
 
+match_threshold = 0.7
 
-def is_image_on_screen():
-    create_images_directory()
+# Pixels added around the last known position when searching there first.
+search_padding = 24
+
+# cv2.matchTemplate releases the GIL, so the templates are matched in parallel.
+match_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="template-match")
+
+# Last region (x, y, width, height) where each template was found, keyed by its path.
+last_locations = {}
+
+detection_stats = {
+    "local_hits": 0,
+    "local_misses": 0,
+    "full_searches": 0,
+}
 
-    image_files = []
+_template_generation = None
 
-    external_directory = globalVariables.image_detection_path
 
-    for filename in os.listdir(external_directory):
-        if filename.lower().endswith(('.png', '.jpg', '.jpeg')):
-            image_files.append(os.path.join(external_directory, filename))
+def match_template(screen_pyramid, template, scale):
+    """ Returns (max_val, max_loc, local_result), local_result being None, "hit" or "miss". """
+    templates = pyramidMatcher.template_pyramid(template, scale)
+    location = last_locations.get(template.path)
 
-    if not image_files:
-        image_directory = r"Resources/Images"
-        for filename in os.listdir(image_directory):
-            if filename.lower().endswith(('.png', '.jpg', '.jpeg')):
-                image_files.append(os.path.join(image_directory, filename))
+    if location is not None:
+        max_val, max_loc = pyramidMatcher.correlate_window(screen_pyramid[0], templates[0],
+                                                           location[0], location[1], search_padding)
 
-    for image_path in image_files:
-        image_to_detect = cv2.imread(image_path)
+        if max_val > match_threshold:
+            return max_val, max_loc, "hit"
 
-        screenshot = pyautogui.screenshot()
+        max_val, max_loc = pyramidMatcher.match(screen_pyramid, templates)
+        return max_val, max_loc, "miss"
 
-        screenshot_np = np.array(screenshot)
-        screenshot_cv = cv2.cvtColor(screenshot_np, cv2.COLOR_RGB2BGR)
+    max_val, max_loc = pyramidMatcher.match(screen_pyramid, templates)
+    return max_val, max_loc, None
 
-        result = cv2.matchTemplate(screenshot_cv, image_to_detect, cv2.TM_CCOEFF_NORMED)
-        min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(result)
 
-        if max_val > 0.7:
-            return True
+def match_all(screen_pyramid, templates, scale):
+    results = list(match_executor.map(lambda template: match_template(screen_pyramid, template, scale), templates))
+
+    found = False
+
+    for template, (max_val, max_loc, local_result) in zip(templates, results):
+        if local_result == "hit":
+            detection_stats["local_hits"] += 1
         else:
-            globalVariables.already_talked = False
+            if local_result == "miss":
+                detection_stats["local_misses"] += 1
+            detection_stats["full_searches"] += 1
+
+        if max_val > match_threshold:
+            template_height, template_width = pyramidMatcher.template_pyramid(template, scale)[0].shape[:2]
+            last_locations[template.path] = (max_loc[0], max_loc[1], template_width, template_height)
+            found = True
+
+    return found
+
+
+def is_image_on_screen(frame=None):
+    global _template_generation
+
+    create_images_directory()
+
+    if frame is None:
+        frame = screenCapture.capture_frame()
+
+    templates = detectionTemplates.get_templates()
+
+    if _template_generation != detectionTemplates.generation:
+        # Neue Erkennungsbilder: Skalierung und Positionen neu bestimmen
+        pyramidMatcher.clear_cache()
+        last_locations.clear()
+        _template_generation = detectionTemplates.generation
+
+    screen_pyramid = frame.gray_pyramid()
+
+    scale = pyramidMatcher.calibrated_scale or 1.0
+
+    found = match_all(screen_pyramid, templates, scale)
+
+    if found:
+        if pyramidMatcher.calibrated_scale is None:
+            pyramidMatcher.set_calibrated_scale(scale)
+    else:
+        # Vielleicht wurde die UI-Skalierung im Spiel geändert
+        calibrated = pyramidMatcher.calibrate(screen_pyramid, templates, match_threshold)
+
+        if calibrated is not None:
+            last_locations.clear()
+            found = match_all(screen_pyramid, templates, calibrated)
+
+    if found:
+        return True
+
+    globalVariables.already_talked = False
+
+    return False
+
+
+def template_regions():
+    return list(last_locations.values())
 
 
 def create_images_directory():
@@ -0,0 +1,398 @@
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import zlib
+from array import array
+
+# Compact binary form of the NPC name files, built once and then memory-mapped at startup:
+# nothing is parsed, and the pages of the file are only read when a lookup touches them.
+#
+# Layout (little endian), every section starts at a multiple of 4:
+#   header      magic, version, length of the metadata
+#   metadata    JSON: languages, the distinct plugin codes, id width, source files (size, mtime,
+#               digest), offset and length of each section
+#   strings     offsets (u32, count + 1) and the UTF-8 bytes of all names and trigrams, sorted and
+#               stored once each (interned, "Gandalf" of three languages is one string)
+#   records     per NPC entry, without padding: name id, codes number, language number, trigram count
+#   exact       hash table (language, name) -> record number + 1, 0 = empty slot
+#   normalized  hash table (language, normalized name) -> record number + 1
+#   grams       per trigram: string id, start and length in the postings
+#   gram_table  hash table trigram -> gram number + 1
+#   postings    record numbers per trigram
+# Ids, record numbers and hash table slots are 16 bit as long as they fit (the shipped files need
+# about 20 000). Normalized names are not stored, they are computed again from the name when needed.
+# The hash tables use open addressing (linear probing) over crc32, so a lookup costs O(1).
+
+database_filename = "npcs.idx"
+
+magic = b"LTSNPC\x00\x01"
+version = 2
+
+_header = struct.Struct("<8sII")
+
+# Hash tables are filled up to this share
+max_load = 0.7
+
+
+def file_digest(path):
+    with open(path, "rb") as file:
+        return hashlib.blake2b(file.read(), digest_size=16).hexdigest()
+
+
+def source_state(files):
+    sources = []
+
+    for lang, path in files.items():
+        stat = os.stat(path)
+        sources.append({"lang": lang, "file": os.path.basename(path), "size": stat.st_size,
+                        "mtime_ns": stat.st_mtime_ns, "digest": file_digest(path)})
+
+    return sources
+
+
+def table_size(count):
+    return max(8, int(count / max_load) + 1)
+
+
+def slot_hash(data, lang_number=None):
+    if lang_number is not None:
+        data = bytes((lang_number,)) + data
+
+    return zlib.crc32(data)
+
+
+def fill_table(typecode, size, items):
+    """ items: (hash, value). Returns the table, value + 1 per used slot. """
+    table = array(typecode, bytes(array(typecode).itemsize * size))
+
+    for hash_value, value in items:
+        slot = hash_value % size
+
+        while table[slot]:
+            slot = (slot + 1) % size
+
+        table[slot] = value + 1
+
+    return table
+
+
+def align(data):
+    return data + bytes(-len(data) % 4)
+
+
+def record_struct(typecode):
+    return struct.Struct(f"<{typecode}BBB")
+
+
+def gram_struct(typecode):
+    return struct.Struct(f"<{typecode}I{typecode}")
+
+
+def build(names, path, files):
+    """ Writes the parsed names (npcIndex.NpcNames) to path. """
+    languages = list(names.languages)
+    lang_numbers = {lang: number for number, lang in enumerate(languages)}
+    codes_list = sorted({codes for _, codes, _, _ in names.entries})
+    codes_numbers = {codes: number for number, codes in enumerate(codes_list)}
+
+    strings = {name for name, _, _, _ in names.entries}
+    strings.update(names.postings)
+    strings = sorted(strings)
+    string_ids = {string: number for number, string in enumerate(strings)}
+
+    # 16 bit ids when every id, record number and slot (+ 1) fits
+    largest = max(len(strings), table_size(len(names.entries)), table_size(len(names.postings)) + 1)
+    typecode = "H" if largest < 2 ** 16 - 1 else "I"
+    record = record_struct(typecode)
+    gram = gram_struct(typecode)
+
+    encoded = [string.encode("utf-8") for string in strings]
+    offsets = array("I", [0])
+
+    for data in encoded:
+        offsets.append(offsets[-1] + len(data))
+
+    records = bytearray()
+
+    for name, codes, count, lang in names.entries:
+        records += record.pack(string_ids[name], codes_numbers[codes], lang_numbers[lang], min(count, 255))
+
+    exact_items = [(slot_hash(name.encode("utf-8"), lang_numbers[lang]), number)
+                   for lang in languages for name, number in names.exact[lang].items()]
+    normalized_items = [(slot_hash(key.encode("utf-8"), lang_numbers[lang]), number)
+                        for lang in languages for key, number in names.normalized[lang].items()]
+
+    grams = bytearray()
+    postings = array(typecode)
+    gram_items = []
+
+    for gram_number, (gram_text, numbers) in enumerate(sorted(names.postings.items())):
+        grams += gram.pack(string_ids[gram_text], len(postings), len(numbers))
+        postings.extend(numbers)
+        gram_items.append((slot_hash(gram_text.encode("utf-8")), gram_number))
+
+    tables = {"exact": exact_items, "normalized": normalized_items, "gram_table": gram_items}
+    table_sizes = {name: table_size(len(items)) for name, items in tables.items()}
+
+    sections = [
+        ("offsets", offsets.tobytes()),
+        ("strings", align(b"".join(encoded))),
+        ("records", align(bytes(records))),
+        ("exact", align(fill_table(typecode, table_sizes["exact"], exact_items).tobytes())),
+        ("normalized", align(fill_table(typecode, table_sizes["normalized"], normalized_items).tobytes())),
+        ("grams", align(bytes(grams))),
+        ("gram_table", align(fill_table(typecode, table_sizes["gram_table"], gram_items).tobytes())),
+        ("postings", align(postings.tobytes())),
+    ]
+
+    # The offsets depend on the length of the metadata, which contains the offsets: measured with
+    # placeholders of the largest possible value, the real metadata is padded to that length
+    metadata = {"languages": languages, "codes": codes_list, "typecode": typecode, "tables": table_sizes,
+                "sources": source_state(files), "sections": {name: [2 ** 32, 2 ** 32] for name, _ in sections}}
+    metadata_length = len(json.dumps(metadata).encode("utf-8"))
+    metadata_length += -(_header.size + metadata_length) % 4
+    position = _header.size + metadata_length
+
+    for name, data in sections:
+        metadata["sections"][name] = [position, len(data)]
+        position += len(data)
+
+    metadata_bytes = json.dumps(metadata).encode("utf-8")
+    metadata_bytes += b" " * (metadata_length - len(metadata_bytes))
+
+    temp_path = path + ".tmp"
+
+    with open(temp_path, "wb") as file:
+        file.write(_header.pack(magic, version, metadata_length))
+        file.write(metadata_bytes)
+
+        for _, data in sections:
+            file.write(data)
+
+    os.replace(temp_path, path)
+
+
+def read_metadata(path):
+    with open(path, "rb") as file:
+        header = file.read(_header.size)
+
+        if len(header) < _header.size:
+            return None
+
+        file_magic, file_version, metadata_length = _header.unpack(header)
+
+        if file_magic != magic or file_version != version:
+            return None
+
+        return json.loads(file.read(metadata_length))
+
+
+def is_stale(path, files):
+    """ True if the database is missing, from another version, or a source file changed since the build. """
+    try:
+        metadata = read_metadata(path)
+    except (OSError, ValueError):
+        return True
+
+    if metadata is None:
+        return True
+
+    sources = metadata["sources"]
+
+    if [(source["lang"], source["file"]) for source in sources] != \
+            [(lang, os.path.basename(source_path)) for lang, source_path in files.items()]:
+        return True
+
+    for source, source_path in zip(sources, files.values()):
+        stat = os.stat(source_path)
+
+        if stat.st_size != source["size"]:
+            return True
+
+        # A newer modification time alone (fresh checkout, unpacked EXE) is no reason to rebuild
+        if stat.st_mtime_ns != source["mtime_ns"] and file_digest(source_path) != source["digest"]:
+            return True
+
+    return False
+
+
+class NpcDatabase:
+    """ Same lookups as npcIndex.NpcNames, read from the memory-mapped database file. """
+
+    def __init__(self, path, normalize):
+        self.path = path
+        # npcIndex.normalize_name, normalized names are not stored in the file
+        self.normalize = normalize
+
+        with open(path, "rb") as file:
+            self.map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        metadata = read_metadata(path)
+
+        if metadata is None:
+            raise ValueError(f"{path} is not an NPC database")
+
+        self.languages = tuple(metadata["languages"])
+        self.lang_numbers = {lang: number for number, lang in enumerate(self.languages)}
+        self.codes = metadata["codes"]
+
+        typecode = metadata["typecode"]
+        self.record_struct = record_struct(typecode)
+        self.gram_struct = gram_struct(typecode)
+
+        view = memoryview(self.map)
+        sections = {name: view[start:start + length] for name, (start, length) in metadata["sections"].items()}
+        itemsize = struct.calcsize(typecode)
+
+        def table(name):
+            # Without the alignment padding at the end, it would look like extra slots
+            return sections[name][:metadata["tables"][name] * itemsize].cast(typecode)
+
+        self.offsets = sections["offsets"].cast("I")
+        self.strings = sections["strings"]
+        self.records = sections["records"]
+        self.grams = sections["grams"]
+        self.postings = sections["postings"]
+        self.exact = table("exact")
+        self.normalized = table("normalized")
+        self.gram_table = table("gram_table")
+        self.typecode = typecode
+        self.itemsize = itemsize
+
+    def string_bytes(self, number):
+        return self.strings[self.offsets[number]:self.offsets[number + 1]]
+
+    def string(self, number):
+        return str(self.string_bytes(number), "utf-8")
+
+    def record(self, number):
+        return self.record_struct.unpack_from(self.records, number * self.record_struct.size)
+
+    def probe(self, table, hash_value):
+        """ Values (+ 1) of the used slots from the hash position on, up to the next empty slot. """
+        size = len(table)
+        slot = hash_value % size
+
+        while table[slot]:
+            yield table[slot] - 1
+            slot = (slot + 1) % size
+
+    def find_exact(self, lang, name):
+        lang_number = self.lang_numbers.get(lang)
+
+        if lang_number is None:
+            return None
+
+        data = name.encode("utf-8")
+
+        for number in self.probe(self.exact, slot_hash(data, lang_number)):
+            name_id, _, record_lang, _ = self.record(number)
+
+            if record_lang == lang_number and self.string_bytes(name_id) == data:
+                return number
+
+        return None
+
+    def find_normalized(self, lang, key):
+        lang_number = self.lang_numbers.get(lang)
+
+        if lang_number is None:
+            return None
+
+        for number in self.probe(self.normalized, slot_hash(key.encode("utf-8"), lang_number)):
+            if self.record(number)[2] == lang_number and self.key(number) == key:
+                return number
+
+        return None
+
+    def entry(self, number):
+        name_id, codes_number, lang_number, count = self.record(number)
+
+        return self.string(name_id), self.codes[codes_number], count, self.languages[lang_number]
+
+    def shape(self, number):
+        _, _, lang_number, count = self.record(number)
+
+        return count, self.languages[lang_number]
+
+    def key(self, number):
+        return self.normalize(self.string(self.record(number)[0]))
+
+    def posting(self, gram):
+        data = gram.encode("utf-8")
+
+        for gram_number in self.probe(self.gram_table, slot_hash(data)):
+            string_id, start, count = self.gram_struct.unpack_from(self.grams, gram_number * self.gram_struct.size)
+
+            if self.string_bytes(string_id) == data:
+                return self.postings[start * self.itemsize:(start + count) * self.itemsize].cast(self.typecode).tolist()
+
+        return None
+
+
+def is_bundled(path):
+    """ True inside the temporary folder of a PyInstaller onefile EXE, which is new on every start. """
+    bundle = getattr(sys, "_MEIPASS", None)
+
+    return bundle is not None and os.path.abspath(path).startswith(os.path.abspath(bundle) + os.sep)
+
+
+def open_database(directory, files, parse, normalize):
+    """
+    Maps the database in directory, rebuilt first if the text files changed.
+    parse(files) parses the text files (npcIndex.NpcNames), normalize(name) gives the normalized name
+    (npcIndex.normalize_name). Returns None if the database cannot be used, the caller then parses the
+    text files itself.
+    """
+    if sys.byteorder != "little" or not files:
+        return None
+
+    path = os.path.join(directory, database_filename)
+
+    if is_stale(path, files):
+        # The EXE ships a prebuilt database; one written to the temporary folder would be lost at exit
+        if is_bundled(path):
+            print(f"NPC database {path} does not match the NPC files, reading the text files")
+            return None
+
+        try:
+            build(parse(files), path, files)
+            print(f"NPC database rebuilt: {path}")
+        except OSError as e:
+            # e.g. read-only installation folder
+            print(f"Could not write NPC database {path}: {e}")
+            return None
+
+    try:
+        return NpcDatabase(path, normalize)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Could not load NPC database {path}: {e}")
+        return None
+
+
+def main():
+    import npcIndex
+
+    parser = argparse.ArgumentParser(description="Compiles the NPC name files into the binary NPC database.")
+    parser.add_argument("--directory", default=npcIndex.npc_directory, help="folder with npcs*.txt")
+    args = parser.parse_args()
+
+    files = npcIndex.npc_files(args.directory)
+
+    if not files:
+        print(f"No NPC files in {args.directory}")
+        return 1
+
+    path = os.path.join(args.directory, database_filename)
+    build(npcIndex.NpcNames(files), path, files)
+    print(f"{path}: {os.path.getsize(path) // 1024} KB, languages {', '.join(files)}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
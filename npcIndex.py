@@ -0,0 +1,333 @@
+import math
+import os
+import re
+import sys
+import threading
+import unicodedata
+from collections import Counter
+import npcDatabase
+from audioCacheKeys import bounded_edit_distance
+
+# All NPC name files (npcs.txt, npcsDE.txt, npcsFR.txt) parsed once into dictionaries per client
+# language: one keyed by the exact name, one by a normalized name (case, accents, punctuation and
+# spacing ignored). A lookup is a dictionary access instead of a scan of the whole file.
+# Lines look like "Aarnikka[m]": the name, then the codes of the plugin ([m] male, [f] female,
+# other letters for objects, vendors, ...).
+# Names with small spelling differences (OCR, plugin output) are found through a trigram index:
+# every normalized name (of all languages) is listed under each of its three-letter groups, a
+# lookup counts the shared groups of the candidates and scores them (Dice coefficient).
+# Candidates that share too few groups to reach the minimum score are skipped unscored.
+# The trigram score alone accepts names that merely contain another one ("Elrond's guard" ->
+# "Elrond"), so a candidate must also have about the same length and be a few edits away.
+# The parsed result is kept in a binary file next to the text files (see npcDatabase), so later
+# starts only map that file into memory instead of parsing the text again.
+
+
+
+def find_npc_directory():
+    """
+    Resources/NPCs relative to the working directory, like the rest of the legacy code. A PyInstaller
+    build reads the copy bundled with --add-data, V2 started from its own folder the one of the repository.
+    """
+    candidates = [os.path.join("Resources", "NPCs")]
+
+    if getattr(sys, "frozen", False):
+        candidates.append(os.path.join(getattr(sys, "_MEIPASS", os.path.dirname(sys.executable)), "Resources", "NPCs"))
+
+    candidates.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "Resources", "NPCs"))
+
+    for candidate in candidates:
+        if os.path.isdir(candidate):
+            return os.path.abspath(candidate)
+
+    return os.path.abspath(candidates[0])
+
+
+npc_directory = find_npc_directory()
+
+# npcs.txt is the active file, it holds the language whose suffixed file is missing (English by default).
+npc_file_suffixes = {"eng": "EN", "deu": "DE", "fra": "FR"}
+
+genders = {"m": "male", "f": "female"}
+
+# A fuzzy candidate needs at least this trigram score (1.0 = same trigrams) ...
+default_min_score = 0.6
+
+# ... a length of at least this share of the longer name ...
+min_length_ratio = 0.85
+
+# ... and at most one edit per this many letters (at least one)
+letters_per_edit = 8
+
+# Best scored candidates checked with the edit distance
+max_verified_candidates = 5
+
+# Shorter names are only matched exactly ("Bob" is not "Rob")
+min_fuzzy_length = 4
+
+_not_alphanumeric = re.compile(r"[\W_]+")
+
+
+def npc_files(directory=npc_directory):
+    files = {}
+
+    for lang, suffix in npc_file_suffixes.items():
+        path = os.path.join(directory, f"npcs{suffix}.txt")
+
+        if os.path.exists(path):
+            files[lang] = path
+
+    active = os.path.join(directory, "npcs.txt")
+
+    if os.path.exists(active):
+        for lang in npc_file_suffixes:
+            if lang not in files:
+                files[lang] = active
+                break
+
+    return files
+
+
+def normalize_name(name):
+    """ "Bardol Nœuderacine " and "bardol noeuderacine" give the same key. """
+    name = unicodedata.normalize("NFKD", name.casefold())
+    name = "".join(char for char in name if not unicodedata.combining(char))
+
+    return _not_alphanumeric.sub("", name.replace("œ", "oe").replace("æ", "ae"))
+
+
+def trigrams(key):
+    padded = f"$${key}$"
+
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def parse_line(line):
+    """ "Aarnikka[m]" -> ("Aarnikka", "m"), a line without codes gives "" as codes. """
+    name, _, codes = line.partition("[")
+    name = name.strip()
+
+    if not name:
+        return None
+
+    return name, codes.split("]", 1)[0].strip().lower()
+
+
+def load_file(path):
+    entries = []
+
+    try:
+        with open(path, "r", encoding="utf-8") as file:
+            for line in file:
+                entry = parse_line(line)
+
+                if entry is not None:
+                    entries.append(entry)
+    except (OSError, UnicodeDecodeError) as e:
+        print(f"Could not read NPC names from {path}: {e}")
+
+    return entries
+
+
+class NpcNames:
+    """ The NPC files parsed into dictionaries (fallback when the binary database cannot be used). """
+
+    def __init__(self, files):
+        # entries: (name, codes, trigram count, language), numbered over all languages, keys: their normalized names.
+        # Per language: exact name -> entry number and normalized name -> entry number.
+        # postings: trigram -> entry numbers (only the first entry of each normalized name).
+        self.entries = []
+        self.keys = []
+        self.exact = {}
+        self.normalized = {}
+        self.postings = {}
+
+        # Without a client language the order of npc_file_suffixes counts (English, as before)
+        for lang in (lang for lang in npc_file_suffixes if lang in files):
+            self.exact[lang] = {}
+            self.normalized[lang] = {}
+
+            for name, codes in load_file(files[lang]):
+                # The first line of a name wins, like the old scan from the top of the file
+                if name in self.exact[lang]:
+                    continue
+
+                key = normalize_name(name)
+                grams = trigrams(key) if key else set()
+                number = len(self.entries)
+
+                self.entries.append((name, codes, len(grams), lang))
+                self.keys.append(key)
+                self.exact[lang][name] = number
+
+                if not key or key in self.normalized[lang]:
+                    continue
+
+                self.normalized[lang][key] = number
+
+                for gram in grams:
+                    self.postings.setdefault(gram, []).append(number)
+
+        self.languages = tuple(self.exact)
+
+    def find_exact(self, lang, name):
+        return self.exact[lang].get(name)
+
+    def find_normalized(self, lang, key):
+        return self.normalized[lang].get(key)
+
+    def entry(self, number):
+        return self.entries[number]
+
+    def key(self, number):
+        return self.keys[number]
+
+    def shape(self, number):
+        """ (trigram count, language) of the entry, all the fuzzy scoring needs. """
+        return self.entries[number][2:]
+
+    def posting(self, gram):
+        return self.postings.get(gram)
+
+
+class NpcIndex:
+    def __init__(self, directory=npc_directory, use_database=True):
+        self.directory = directory
+        self.data = None
+        self.languages = ()
+
+        self.load(use_database)
+
+    def load(self, use_database=True):
+        files = npc_files(self.directory)
+
+        if not files:
+            print(f"WARNING: No NPC name files found in {self.directory}, NPC genders are unknown.")
+        data = npcDatabase.open_database(self.directory, files, NpcNames, normalize_name) if use_database else None
+
+        if data is None:
+            data = NpcNames(files)
+
+        self.data = data
+        self.languages = data.languages
+
+    def search_order(self, lang):
+        """ The client language first, the others after it (a name may only exist in one file). """
+        if lang in self.languages:
+            return (lang,) + tuple(other for other in self.languages if other != lang)
+
+        return self.languages
+
+    def fuzzy_match(self, key, lang, min_score):
+        """ (number of the entry, score) of the most similar name, or None. """
+        grams = trigrams(key)
+        max_edits = max(1, len(key) // letters_per_edit)
+
+        # Dice = 2 * common / (grams + other grams) and other grams >= common, so a name with fewer
+        # shared groups than this can never reach min_score. An edit changes at most three groups,
+        # so a name within max_edits keeps at least all but 3 * max_edits of them.
+        needed = max(math.ceil(min_score * len(grams) / (2 - min_score)), len(grams) - 3 * max_edits)
+
+        postings = sorted((self.data.posting(gram) or () for gram in grams), key=len)
+
+        # A name that shares `needed` groups has at least one of the rarest len - needed + 1 groups:
+        # only those are counted in full, the frequent ones only for names already found
+        prefix = len(postings) - needed + 1
+        shared = Counter()
+
+        for numbers in postings[:prefix]:
+            shared.update(numbers)
+
+        for numbers in postings[prefix:]:
+            shared.update(shared.keys() & numbers)
+
+        order = self.search_order(lang)
+        candidates = []
+
+        for number, common in [item for item in shared.items() if item[1] >= needed]:
+            count, entry_lang = self.data.shape(number)
+            score = 2 * common / (len(grams) + count)
+
+            if score >= min_score:
+                # On a tie the client language (searched first) wins
+                candidates.append((score, -order.index(entry_lang), number))
+
+        for score, _, number in sorted(candidates, reverse=True)[:max_verified_candidates]:
+            other = self.data.key(number)
+
+            if min(len(key), len(other)) < min_length_ratio * max(len(key), len(other)):
+                continue
+
+            if bounded_edit_distance(key, other, max_edits) is not None:
+                return number, score
+
+        return None
+
+    def match(self, name, lang=None, fuzzy=True, min_score=default_min_score):
+        """ (NPC name as in the file, codes, score) or None. Exact and normalized names take the fast path. """
+        if not name:
+            return None
+
+        name = name.strip()
+
+        for current in self.search_order(lang):
+            number = self.data.find_exact(current, name)
+
+            if number is not None:
+                return name, self.data.entry(number)[1], 1.0
+
+        key = normalize_name(name)
+
+        if not key:
+            return None
+
+        for current in self.search_order(lang):
+            number = self.data.find_normalized(current, key)
+
+            if number is not None:
+                found_name, codes, _, _ = self.data.entry(number)
+                return found_name, codes, 1.0
+
+        if not fuzzy or len(key) < min_fuzzy_length:
+            return None
+
+        found = self.fuzzy_match(key, lang, min_score)
+
+        if found is None or found[1] < min_score:
+            return None
+
+        number, score = found
+        found_name, codes, _, _ = self.data.entry(number)
+
+        return found_name, codes, score
+
+    def codes(self, name, lang=None, fuzzy=True):
+        """ Plugin codes of the NPC ("m", "f", "nm", ...), None if the name is unknown. """
+        found = self.match(name, lang, fuzzy)
+
+        return found[1] if found else None
+
+    def gender(self, name, lang=None, fuzzy=True):
+        """ "male", "female" or None (unknown name, object, several codes). """
+        return genders.get(self.codes(name, lang, fuzzy))
+
+    def languages_of(self, name):
+        """ Languages whose NPC file contains the name. """
+        key = normalize_name(name)
+
+        return [lang for lang in self.languages if key and self.data.find_normalized(lang, key) is not None]
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_index(directory=npc_directory):
+    with _indexes_lock:
+        index = _indexes.get(directory)
+
+        if index is None:
+            index = NpcIndex(directory)
+            _indexes[directory] = index
+
+        return index
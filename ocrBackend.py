@@ -0,0 +1,271 @@
+import os
+import re
+import threading
+import numpy as np
+import pytesseract
+
+try:
+    import tesserocr
+except ImportError:
+    tesserocr = None
+
+# OCR backends. pytesseract starts a new tesseract process for every call, writes the
+# image to a temporary file and loads the traineddata again each time. The tesserocr
+# backend keeps one warm Tesseract engine per language inside the process instead.
+# pytesseract stays as fallback when tesserocr is not installed or keeps failing.
+#
+# recognize() returns the text together with the word confidences, so junk from partial
+# frames or bad crops can be rejected before it reaches the TTS (see ocrQualityGate).
+
+# Without a dictionary (pytesseract) a word counts as valid when it is made of letters only.
+_word_pattern = re.compile(r"^[^\W\d_]+$")
+_punctuation = "\"'.,;:!?()[]«»„“”‘’-–—…"
+
+# Elided and compound words ("l'heure", "qu'il", "n'est-ce", "don't") are checked part by part
+_word_separators = re.compile(r"['’-]")
+
+
+def count_words(tokens, is_valid=None):
+    """
+    (words, valid words) of the OCR tokens. Tokens made of punctuation only (French puts "?" and ":"
+    between spaces) are not counted. is_valid: dictionary check of the backend, None = letters only.
+    """
+    words = 0
+    valid_words = 0
+
+    for token in tokens:
+        word = token.strip(_punctuation)
+        parts = [part for part in _word_separators.split(word) if part]
+
+        if not parts:
+            continue
+
+        words += 1
+
+        if not all(_word_pattern.match(part) for part in parts):
+            continue
+
+        if is_valid is None or is_valid(word):
+            valid_words += 1
+        elif len(parts) > 1 and all(len(part) <= 2 or is_valid(part) for part in parts):
+            # "l", "qu", "t" of an elision are no dictionary words on their own
+            valid_words += 1
+
+    return words, valid_words
+
+
+class OcrResult:
+    def __init__(self, text, confidences=(), words=0, valid_words=None):
+        self.text = text
+        # Confidence (0-100) of every recognized word
+        self.confidences = list(confidences)
+        self.words = words
+        # Words found in the dictionary, None when the backend cannot tell
+        self.valid_words = valid_words
+
+    @property
+    def mean_confidence(self):
+        if not self.confidences:
+            return None
+
+        return sum(self.confidences) / len(self.confidences)
+
+    @property
+    def word_ratio(self):
+        if self.valid_words is None or not self.words:
+            return None
+
+        return self.valid_words / self.words
+
+    @staticmethod
+    def merge(results, separator="\n"):
+        """ Joins the results of several image parts (e.g. text blocks) in order. """
+        results = list(results)
+        valid = [result.valid_words for result in results]
+
+        return OcrResult(separator.join(result.text for result in results),
+                         [confidence for result in results for confidence in result.confidences],
+                         sum(result.words for result in results),
+                         None if any(count is None for count in valid) else sum(valid))
+
+
+class PytesseractBackend:
+    name = "pytesseract"
+
+    def image_to_string(self, image, lang, psm=None):
+        config = f"--psm {psm}" if psm is not None else ""
+
+        return pytesseract.image_to_string(image, lang=lang, config=config)
+
+    def recognize(self, image, lang, psm=None):
+        config = f"--psm {psm}" if psm is not None else ""
+
+        data = pytesseract.image_to_data(image, lang=lang, config=config, output_type=pytesseract.Output.DICT)
+
+        # Wörter wieder zu Zeilen zusammensetzen, Absätze durch eine Leerzeile getrennt
+        lines = []
+        confidences = []
+        tokens = []
+        current_line = None
+        current_paragraph = None
+
+        for index, word in enumerate(data["text"]):
+            word = word.strip()
+            confidence = float(data["conf"][index])
+
+            if not word or confidence < 0:
+                continue
+
+            paragraph = (data["block_num"][index], data["par_num"][index])
+            line = paragraph + (data["line_num"][index],)
+
+            if line != current_line:
+                if current_paragraph is not None and paragraph != current_paragraph:
+                    lines.append("")
+                lines.append(word)
+                current_line, current_paragraph = line, paragraph
+            else:
+                lines[-1] += " " + word
+
+            confidences.append(confidence)
+            tokens.append(word)
+
+        words, valid_words = count_words(tokens)
+
+        return OcrResult("\n".join(lines), confidences, words, valid_words)
+
+
+class TesserocrBackend:
+    name = "tesserocr"
+
+    def __init__(self, tessdata_path=None):
+        self.tessdata_path = tessdata_path
+        self._apis = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    def _get_api(self, lang):
+        with self._lock:
+            api = self._apis.get(lang)
+
+            if api is None:
+                path = self.tessdata_path or find_tessdata_path()
+
+                if path:
+                    api = tesserocr.PyTessBaseAPI(path=path, lang=lang)
+                else:
+                    api = tesserocr.PyTessBaseAPI(lang=lang)
+
+                self._apis[lang] = api
+                self._locks[lang] = threading.Lock()
+
+            return api, self._locks[lang]
+
+    def image_to_string(self, image, lang, psm=None):
+        api, lock = self._get_api(lang)
+
+        image = np.ascontiguousarray(image)
+        height, width = image.shape[:2]
+        channels = 1 if image.ndim == 2 else image.shape[2]
+
+        with lock:
+            api.SetPageSegMode(psm if psm is not None else tesserocr.PSM.AUTO)
+            api.SetImageBytes(image.tobytes(), width, height, channels, width * channels)
+            return api.GetUTF8Text()
+
+    def recognize(self, image, lang, psm=None):
+        api, lock = self._get_api(lang)
+
+        image = np.ascontiguousarray(image)
+        height, width = image.shape[:2]
+        channels = 1 if image.ndim == 2 else image.shape[2]
+
+        with lock:
+            api.SetPageSegMode(psm if psm is not None else tesserocr.PSM.AUTO)
+            api.SetImageBytes(image.tobytes(), width, height, channels, width * channels)
+            text = api.GetUTF8Text()
+            confidences = api.AllWordConfidences()
+
+            # Wörterbuchprüfung mit dem geladenen Sprachmodell
+            words, valid_words = count_words(text.split(), api.IsValidWord)
+
+        return OcrResult(text, confidences, words, valid_words)
+
+    def close(self):
+        with self._lock:
+            for api in self._apis.values():
+                api.End()
+            self._apis.clear()
+            self._locks.clear()
+
+
+def find_tessdata_path():
+    # Bei Windows-Installationen liegt tessdata neben der tesseract.exe
+    command = pytesseract.pytesseract.tesseract_cmd
+
+    if command and os.path.isabs(command):
+        path = os.path.join(os.path.dirname(command), "tessdata")
+
+        if os.path.isdir(path):
+            return path
+
+    return os.environ.get("TESSDATA_PREFIX")
+
+
+# Consecutive failures after which tesserocr is given up for the rest of the session
+max_failures = 3
+
+_fallback = PytesseractBackend()
+_backend = None
+_backend_lock = threading.Lock()
+_failures = 0
+
+
+def get_backend():
+    global _backend
+
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = TesserocrBackend() if tesserocr is not None else _fallback
+                print(f"OCR backend: {_backend.name}")
+
+    return _backend
+
+
+def _call(method, image, lang, psm):
+    global _backend, _failures
+
+    backend = get_backend()
+
+    if backend is _fallback:
+        return getattr(_fallback, method)(image, lang, psm)
+
+    try:
+        result = getattr(backend, method)(image, lang, psm)
+    except Exception as e:
+        # Only this call goes to pytesseract; a single bad image does not disable tesserocr,
+        # repeated failures (e.g. missing traineddata) do
+        with _backend_lock:
+            _failures += 1
+
+            if _failures >= max_failures and _backend is backend:
+                print(f"OCR backend {backend.name} failed {_failures} times ({e}), using pytesseract from now on.")
+                _backend = _fallback
+            else:
+                print(f"OCR backend {backend.name} failed ({e}), using pytesseract for this image.")
+
+        return getattr(_fallback, method)(image, lang, psm)
+
+    _failures = 0
+    return result
+
+
+def image_to_string(image, lang, psm=None):
+    """ image: NumPy array (grayscale or RGB). """
+    return _call("image_to_string", image, lang, psm)
+
+
+def recognize(image, lang, psm=None):
+    """ Like image_to_string, but returns an OcrResult with the word confidences. """
+    return _call("recognize", image, lang, psm)
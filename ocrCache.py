@@ -0,0 +1,132 @@
+import atexit
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+import cv2
+import numpy as np
+
+# Remembers the cleaned OCR text of quest pages. The key is a digest of the binarized text
+# pixels, cut to their bounding box, so the same page is recognized again when the crop is
+# shifted by a few pixels. On a hit Tesseract is skipped.
+# There is no tolerance for differing pixels: a coarse (perceptual) hash gave the same key for
+# "bring me 5" and "bring me 8" or another player name, while a 1 px shift flipped more of its
+# bits than a changed word. A page that differs in a single pixel is simply read again.
+# The cache is a bounded LRU and is saved to disk, so it also works across sessions.
+
+
+def image_hash(binary_image):
+    """ Digest of the (binarized, single channel) text crop, cut to its non-zero pixels. """
+    rows = np.flatnonzero(binary_image.max(axis=1))
+
+    if rows.size:
+        cols = np.flatnonzero(binary_image.max(axis=0))
+        binary_image = binary_image[rows[0]:rows[-1] + 1, cols[0]:cols[-1] + 1]
+
+    digest = hashlib.blake2b(np.packbits(binary_image > 0).tobytes(), digest_size=16,
+                             person=str(binary_image.shape[1]).encode("ascii"))
+
+    return int.from_bytes(digest.digest(), "big")
+
+
+def binarize(image):
+    """ Binarizes a grayscale or RGB crop for hashing (Otsu threshold). """
+    gray = image if image.ndim == 2 else cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
+    _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+
+    return binary
+
+
+class OcrCache:
+    def __init__(self, path, capacity=500, save_every=10):
+        """
+        save_every: number of new entries after which the cache is written to disk.
+        capacity 0 (or less) disables the cache.
+        """
+        self.path = path
+        self.capacity = max(0, capacity)
+        self.save_every = save_every
+
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+        self._unsaved = 0
+        self._lock = threading.Lock()
+
+        self.load()
+        atexit.register(self.save)
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def lookup(self, image_hash, lang):
+        with self._lock:
+            key = (lang, image_hash)
+            text = self.entries.get(key)
+
+            if text is None:
+                self.misses += 1
+                return None
+
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return text
+
+    def store(self, image_hash, lang, text):
+        # A disabled cache must not overwrite the file on disk with an empty list
+        if self.capacity == 0:
+            return
+
+        with self._lock:
+            self.entries[(lang, image_hash)] = text
+            self.entries.move_to_end((lang, image_hash))
+
+            while len(self.entries) > self.capacity:
+                self.entries.popitem(last=False)
+
+            self._unsaved += 1
+            save_now = self._unsaved >= self.save_every
+
+        if save_now:
+            self.save()
+
+    def load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as file:
+                data = json.load(file)
+        except (FileNotFoundError, ValueError):
+            return
+
+        # data[-0:] would be the whole list
+        if self.capacity == 0:
+            return
+
+        for lang, image_hash, text in data[-self.capacity:]:
+            self.entries[(lang, int(image_hash, 16))] = text
+
+    def save(self):
+        with self._lock:
+            if not self._unsaved:
+                return
+
+            data = [[lang, format(image_hash, "x"), text] for (lang, image_hash), text in self.entries.items()]
+            self._unsaved = 0
+
+        try:
+            directory = os.path.dirname(self.path)
+
+            if directory and not os.path.exists(directory):
+                os.makedirs(directory)
+
+            temp_path = self.path + ".tmp"
+
+            with open(temp_path, "w", encoding="utf-8") as file:
+                json.dump(data, file, ensure_ascii=False)
+
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            print(f"Could not save OCR cache: {e}")
@@ -0,0 +1,63 @@
+import os
+import globalVariables
+
+# Rejects OCR results that are most likely junk (half drawn quest window, fade-in animation,
+# wrong crop) before they are cleaned and sent to the TTS. A result is rejected when the mean
+# word confidence of Tesseract or the share of real words is below its threshold.
+
+default_min_confidence = 55.0
+default_min_word_ratio = 0.5
+
+# The word ratio says little about very short texts.
+min_words_for_ratio = 3
+
+gate_stats = {"checked": 0, "rejected_confidence": 0, "rejected_words": 0}
+
+
+def check(result, min_confidence=default_min_confidence, min_word_ratio=default_min_word_ratio):
+    """ result: ocrBackend.OcrResult. Returns True when the text may be used. """
+    gate_stats["checked"] += 1
+
+    confidence = result.mean_confidence
+
+    if min_confidence and confidence is not None and confidence < min_confidence:
+        gate_stats["rejected_confidence"] += 1
+        print(f"OCR result rejected: mean confidence {confidence:.0f} < {min_confidence:.0f}")
+        return False
+
+    ratio = result.word_ratio
+
+    if min_word_ratio and ratio is not None and result.words >= min_words_for_ratio and ratio < min_word_ratio:
+        gate_stats["rejected_words"] += 1
+        print(f"OCR result rejected: only {ratio:.0%} real words")
+        return False
+
+    return True
+
+
+def rejected():
+    return gate_stats["rejected_confidence"] + gate_stats["rejected_words"]
+
+
+def create_min_confidence_file():
+    if not os.path.exists(globalVariables.config_path):
+        os.makedirs(globalVariables.config_path)
+
+    try:
+        with open(globalVariables.config_path + r"/ocr_min_confidence.txt", "x") as file:
+            pass
+    except FileExistsError:
+        pass
+
+
+def load_min_confidence():
+    try:
+        with open(globalVariables.config_path + r"/ocr_min_confidence.txt", "r") as file:
+            lines = file.readlines()
+
+            if len(lines) > 0 and lines[0].strip():
+                return float(lines[0].strip())
+
+            return default_min_confidence
+    except (FileNotFoundError, ValueError):
+        return default_min_confidence
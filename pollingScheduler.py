@@ -0,0 +1,125 @@
+import os
+import time
+import globalVariables
+
+# Decides how long the monitor loop sleeps between two detection cycles.
+# Around quest dialogs it polls fast, while no dialog has been seen for a while it backs off.
+# On top of that the CPU time of the whole companion process (all threads) is kept under a
+# budget, because it shares the CPU with the game client.
+
+default_cpu_budget = 10.0
+
+
+class PollingScheduler:
+    def __init__(self, cpu_budget_percent=default_cpu_budget, fast_interval=0.25, normal_interval=0.5,
+                 idle_interval=2.0, triggered_idle_interval=4.0, max_interval=5.0, active_seconds=15.0,
+                 backoff_factor=1.5):
+        """
+        cpu_budget_percent: share of the total CPU (all cores, like in the Task Manager) the
+        companion may use. 0 or None disables the budget.
+        triggered_idle_interval: slower idle rate used while an event source (Script.log)
+        wakes the loop up for new dialogs.
+        active_seconds: how long after the last dialog the loop keeps polling fast.
+        """
+        self.cpu_budget = (cpu_budget_percent or 0) / 100.0
+        self.fast_interval = fast_interval
+        self.normal_interval = normal_interval
+        self.idle_interval = idle_interval
+        self.blind_idle_interval = idle_interval
+        self.triggered_idle_interval = triggered_idle_interval
+        self.max_interval = max_interval
+        self.active_seconds = active_seconds
+        self.backoff_factor = backoff_factor
+
+        self.cpu_count = os.cpu_count() or 1
+        self.interval = normal_interval
+        self.last_dialog = None
+
+        self._cycle_start = None
+        self._mark_wall = time.monotonic()
+        self._mark_cpu = time.process_time()
+
+        self.stats = {
+            "cycles": 0,
+            "budget_throttled": 0,
+            "triggered": 0,
+            "cpu_percent": 0.0,
+            "interval": normal_interval,
+        }
+
+    def start_cycle(self):
+        self._cycle_start = time.monotonic()
+
+    def dialog_seen(self):
+        self.last_dialog = time.monotonic()
+
+    def set_event_trigger(self, active):
+        """ With an active event source, blind polling only has to be a slow fallback. """
+        self.idle_interval = self.triggered_idle_interval if active else self.blind_idle_interval
+
+    def triggered(self):
+        self.stats["triggered"] += 1
+        self.dialog_seen()
+
+    def next_interval(self, dialog_seen=False):
+        now = time.monotonic()
+
+        if dialog_seen:
+            self.dialog_seen()
+
+        if self.last_dialog is not None and now - self.last_dialog < self.active_seconds:
+            self.interval = self.fast_interval
+        else:
+            self.interval = min(self.idle_interval, max(self.normal_interval, self.interval * self.backoff_factor))
+
+        delay = self.interval
+
+        cpu_now = time.process_time()
+        cpu_used = cpu_now - self._mark_cpu
+        wall = now - self._mark_wall
+
+        if wall > 0:
+            self.stats["cpu_percent"] = 100.0 * cpu_used / (wall * self.cpu_count)
+
+        if self.cpu_budget > 0:
+            # Assuming the next period costs as much CPU as the last one, it has to last at
+            # least cpu_used / budget seconds to stay under the budget.
+            required_period = cpu_used / (self.cpu_budget * self.cpu_count)
+            cycle_wall = now - self._cycle_start if self._cycle_start is not None else 0.0
+
+            if required_period - cycle_wall > delay:
+                delay = min(self.max_interval, required_period - cycle_wall)
+                self.stats["budget_throttled"] += 1
+
+        self._mark_wall = now
+        self._mark_cpu = cpu_now
+        self._cycle_start = None
+
+        self.stats["cycles"] += 1
+        self.stats["interval"] = delay
+
+        return delay
+
+
+def create_cpu_budget_file():
+    if not os.path.exists(globalVariables.config_path):
+        os.makedirs(globalVariables.config_path)
+
+    try:
+        with open(globalVariables.config_path + r"/cpu_budget.txt", "x") as file:
+            pass
+    except FileExistsError:
+        pass
+
+
+def load_cpu_budget():
+    try:
+        with open(globalVariables.config_path + r"/cpu_budget.txt", "r") as file:
+            lines = file.readlines()
+
+            if len(lines) > 0 and lines[0].strip():
+                return float(lines[0].strip().rstrip("%"))
+
+            return default_cpu_budget
+    except (FileNotFoundError, ValueError):
+        return default_cpu_budget
@@ -0,0 +1,222 @@
+import threading
+import time
+import cv2
+
+# Coarse-to-fine template matching on grayscale image pyramids.
+# The correlation runs first on a downsampled copy of the screen and only the best
+# candidates are refined at full resolution. The template scale (LOTRO UI scale) is
+# calibrated once per session and cached.
+
+# Templates are never downsampled below this many pixels on their shortest side.
+min_template_side = 8
+max_levels = 3
+
+# Number of coarse candidates that get refined at full resolution.
+refine_candidates = 3
+
+# UI scales that are tried when the templates are not found at their native size.
+candidate_scales = (1.0, 0.8, 0.9, 1.1, 1.2, 1.3, 1.5)
+
+# Seconds between two calibration attempts while no quest window is found at the cached scale.
+calibration_interval = 5.0
+
+_lock = threading.Lock()
+_template_cache = {}
+
+calibrated_scale = None
+_last_calibration = 0.0
+
+
+def build_pyramid(image, levels):
+    pyramid = [image]
+
+    for _ in range(levels):
+        pyramid.append(cv2.pyrDown(pyramid[-1]))
+
+    return pyramid
+
+
+def usable_levels(template_shape):
+    levels = 0
+    side = min(template_shape[:2])
+
+    while levels < max_levels and side / 2 >= min_template_side:
+        side /= 2
+        levels += 1
+
+    return levels
+
+
+def template_pyramid(template, scale):
+    """ Grayscale pyramid of a detection template resized to the given UI scale. """
+    key = (template.path, scale)
+
+    pyramid = _template_cache.get(key)
+
+    if pyramid is None:
+        gray = template.gray
+
+        if scale != 1.0:
+            width = max(1, int(round(gray.shape[1] * scale)))
+            height = max(1, int(round(gray.shape[0] * scale)))
+            interpolation = cv2.INTER_AREA if scale < 1.0 else cv2.INTER_LINEAR
+            gray = cv2.resize(gray, (width, height), interpolation=interpolation)
+
+        pyramid = build_pyramid(gray, usable_levels(gray.shape))
+
+        with _lock:
+            _template_cache[key] = pyramid
+
+    return pyramid
+
+
+def clear_cache():
+    global calibrated_scale
+
+    with _lock:
+        _template_cache.clear()
+        calibrated_scale = None
+
+
+def correlate(image, template_image):
+    result = cv2.matchTemplate(image, template_image, cv2.TM_CCOEFF_NORMED)
+    min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(result)
+
+    return max_val, max_loc
+
+
+def correlate_window(image, template_image, x, y, padding):
+    """ Correlates only a padded window around (x, y) and returns screen coordinates. """
+    template_height, template_width = template_image.shape[:2]
+    image_height, image_width = image.shape[:2]
+
+    x1 = max(0, x - padding)
+    y1 = max(0, y - padding)
+    x2 = min(image_width, x + template_width + padding)
+    y2 = min(image_height, y + template_height + padding)
+
+    if x2 - x1 < template_width or y2 - y1 < template_height:
+        return -1.0, None
+
+    max_val, max_loc = correlate(image[y1:y2, x1:x2], template_image)
+
+    return max_val, (max_loc[0] + x1, max_loc[1] + y1)
+
+
+def coarse_peaks(result, count, template_shape):
+    """ Best `count` positions of a correlation map, with non-maximum suppression. """
+    result = result.copy()
+    suppress_height, suppress_width = template_shape[:2]
+
+    peaks = []
+
+    for _ in range(count):
+        min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(result)
+
+        if max_val <= -1.0:
+            break
+
+        peaks.append((max_val, max_loc))
+
+        x, y = max_loc
+        result[max(0, y - suppress_height):y + suppress_height + 1,
+               max(0, x - suppress_width):x + suppress_width + 1] = -1.0
+
+    return peaks
+
+
+def match(screen_pyramid, templates):
+    """
+    screen_pyramid: grayscale pyramid of the screenshot (level 0 = full resolution).
+    templates: grayscale pyramid of the template.
+    Returns (max_val, max_loc) at full resolution.
+    """
+    levels = min(len(screen_pyramid), len(templates)) - 1
+
+    while levels > 0 and (templates[levels].shape[0] > screen_pyramid[levels].shape[0] or
+                          templates[levels].shape[1] > screen_pyramid[levels].shape[1]):
+        levels -= 1
+
+    full_template = templates[0]
+
+    if full_template.shape[0] > screen_pyramid[0].shape[0] or full_template.shape[1] > screen_pyramid[0].shape[1]:
+        return -1.0, None
+
+    if levels == 0:
+        return correlate(screen_pyramid[0], full_template)
+
+    coarse = cv2.matchTemplate(screen_pyramid[levels], templates[levels], cv2.TM_CCOEFF_NORMED)
+    factor = 2 ** levels
+
+    best_val, best_loc = -1.0, None
+
+    for coarse_val, (coarse_x, coarse_y) in coarse_peaks(coarse, refine_candidates, templates[levels].shape):
+        max_val, max_loc = correlate_window(screen_pyramid[0], full_template,
+                                            coarse_x * factor, coarse_y * factor, factor + 2)
+
+        if max_val > best_val:
+            best_val, best_loc = max_val, max_loc
+
+    return best_val, best_loc
+
+
+def coarse_score(screen_pyramid, templates):
+    """ Cheap score at the coarsest shared level, used to rank UI scales. """
+    levels = min(len(screen_pyramid), len(templates)) - 1
+
+    template_image = templates[levels]
+    screen_image = screen_pyramid[levels]
+
+    if template_image.shape[0] > screen_image.shape[0] or template_image.shape[1] > screen_image.shape[1]:
+        return -1.0
+
+    return correlate(screen_image, template_image)[0]
+
+
+def calibrate(screen_pyramid, templates, threshold):
+    """
+    Looks for the UI scale at which the templates match best, skipping the scale already in use.
+    Returns the scale, or None when no scale reaches the threshold.
+    Attempts are throttled to one every calibration_interval seconds.
+    """
+    global _last_calibration
+
+    now = time.monotonic()
+
+    if now - _last_calibration < calibration_interval:
+        return None
+
+    _last_calibration = now
+
+    current_scale = calibrated_scale or 1.0
+
+    ranked = []
+
+    for scale in candidate_scales:
+        if scale == current_scale:
+            continue
+
+        best = max((coarse_score(screen_pyramid, template_pyramid(template, scale)) for template in templates),
+                   default=-1.0)
+        ranked.append((best, scale))
+
+    ranked.sort(reverse=True)
+
+    for _, scale in ranked[:2]:
+        for template in templates:
+            max_val, max_loc = match(screen_pyramid, template_pyramid(template, scale))
+
+            if max_val > threshold:
+                set_calibrated_scale(scale)
+                return scale
+
+    return None
+
+
+def set_calibrated_scale(scale):
+    global calibrated_scale
+
+    if calibrated_scale != scale:
+        print(f"Detection images calibrated to UI scale {scale}.")
+
+    calibrated_scale = scale
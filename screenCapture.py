@@ -0,0 +1,156 @@
+import os
+import threading
+import cv2
+import numpy as np
+from screenFrame import Frame
+
+try:
+    import mss
+except ImportError:
+    mss = None
+
+# One interface for every way of getting a screenshot. All sources return a Frame with the
+# raw NumPy pixels, the color conversions happen lazily in the Frame itself.
+#
+# Setting the environment variable below to a folder of PNG screenshots replays them instead
+# of capturing the screen, so the pipeline can be benchmarked and tested headless.
+replay_environment_variable = "LOTROTOSPEECH_REPLAY_DIR"
+
+
+class MssCapture:
+    """ Keeps one mss session open for the whole run instead of creating one per screenshot. """
+
+    def __init__(self, monitor_index=1):
+        self.monitor_index = monitor_index
+        self._sct = None
+        self._lock = threading.Lock()
+
+    def grab(self, monitor_index=None):
+        if monitor_index is None:
+            monitor_index = self.monitor_index
+
+        with self._lock:
+            if self._sct is None:
+                self._sct = mss.mss()
+
+            monitors = self._sct.monitors
+
+            if monitor_index >= len(monitors):
+                monitor_index = 1
+
+            shot = self._sct.grab(monitors[monitor_index])
+
+        # np.asarray uses the raw BGRA buffer of mss directly, no copy and no PIL image.
+        return Frame(np.asarray(shot), "BGRA")
+
+    def close(self):
+        with self._lock:
+            if self._sct is not None:
+                self._sct.close()
+                self._sct = None
+
+
+class PyAutoGuiCapture:
+    """ Fallback when mss is not installed. Only captures the primary monitor. """
+
+    def grab(self, monitor_index=None):
+        import pyautogui
+
+        return Frame(np.asarray(pyautogui.screenshot()), "RGB")
+
+    def close(self):
+        pass
+
+
+class FileReplayCapture:
+    """ Returns the images of a folder one after the other, starting over at the end. """
+
+    def __init__(self, directory, loop=True, preload=False):
+        self.directory = directory
+        self.loop = loop
+        self.paths = [os.path.join(directory, filename) for filename in sorted(os.listdir(directory))
+                      if filename.lower().endswith(('.png', '.jpg', '.jpeg'))]
+        self.position = 0
+        self._images = {}
+        self._lock = threading.Lock()
+
+        if not self.paths:
+            raise FileNotFoundError(f"No screenshots found in {directory}")
+
+        if preload:
+            for path in self.paths:
+                self._images[path] = self.read(path)
+
+    @staticmethod
+    def read(path):
+        image = cv2.imread(path, cv2.IMREAD_COLOR)
+
+        if image is None:
+            raise ValueError(f"Could not read screenshot: {path}")
+
+        return image
+
+    @property
+    def current_path(self):
+        return self.paths[max(0, self.position - 1)]
+
+    def grab(self, monitor_index=None):
+        with self._lock:
+            if self.position >= len(self.paths):
+                if not self.loop:
+                    return None
+                self.position = 0
+
+            path = self.paths[self.position]
+            self.position += 1
+
+        image = self._images.get(path)
+
+        if image is None:
+            image = self.read(path)
+
+        return Frame(image, "BGR")
+
+    def close(self):
+        pass
+
+
+_source = None
+_source_lock = threading.Lock()
+
+
+def create_capture_source(monitor_index=1):
+    replay_directory = os.environ.get(replay_environment_variable)
+
+    if replay_directory:
+        print(f"Replaying screenshots from {replay_directory}")
+        return FileReplayCapture(replay_directory)
+
+    if mss is not None:
+        return MssCapture(monitor_index)
+
+    return PyAutoGuiCapture()
+
+
+def get_capture_source():
+    global _source
+
+    if _source is None:
+        with _source_lock:
+            if _source is None:
+                _source = create_capture_source()
+
+    return _source
+
+
+def set_capture_source(source):
+    global _source
+
+    with _source_lock:
+        if _source is not None and _source is not source:
+            _source.close()
+        _source = source
+
+
+def capture_frame(monitor_index=None):
+    return get_capture_source().grab(monitor_index)
@@ -0,0 +1,85 @@
+import threading
+import cv2
+import pyramidMatcher
+
+# One full-screen capture per detection cycle, shared by template matching and OCR.
+# Color conversions are done lazily and only once per frame.
+
+_to_bgr = {
+    "RGB": cv2.COLOR_RGB2BGR,
+    "BGRA": cv2.COLOR_BGRA2BGR,
+}
+
+_to_gray = {
+    "RGB": cv2.COLOR_RGB2GRAY,
+    "BGR": cv2.COLOR_BGR2GRAY,
+    "BGRA": cv2.COLOR_BGRA2GRAY,
+}
+
+_to_rgb = {
+    "BGR": cv2.COLOR_BGR2RGB,
+    "BGRA": cv2.COLOR_BGRA2RGB,
+}
+
+
+class Frame:
+    def __init__(self, pixels, channel_order="RGB"):
+        self.pixels = pixels
+        self.channel_order = channel_order
+        self._bgr = None
+        self._gray_pyramid = None
+        self._lock = threading.Lock()
+
+    @property
+    def height(self):
+        return self.pixels.shape[0]
+
+    @property
+    def width(self):
+        return self.pixels.shape[1]
+
+    @property
+    def bgr(self):
+        if self._bgr is None:
+            with self._lock:
+                if self._bgr is None:
+                    if self.channel_order == "BGR":
+                        self._bgr = self.pixels
+                    else:
+                        self._bgr = cv2.cvtColor(self.pixels, _to_bgr[self.channel_order])
+        return self._bgr
+
+    @property
+    def gray(self):
+        return self.gray_pyramid()[0]
+
+    def gray_pyramid(self):
+        if self._gray_pyramid is None:
+            with self._lock:
+                if self._gray_pyramid is None:
+                    gray = cv2.cvtColor(self.pixels, _to_gray[self.channel_order])
+                    self._gray_pyramid = pyramidMatcher.build_pyramid(gray, pyramidMatcher.max_levels)
+        return self._gray_pyramid
+
+    def clip_bbox(self, start_x, start_y, end_x, end_y):
+        if end_x < start_x:
+            start_x, end_x = end_x, start_x
+        if end_y < start_y:
+            start_y, end_y = end_y, start_y
+
+        start_x = min(max(int(round(start_x)), 0), self.width)
+        end_x = min(max(int(round(end_x)), 0), self.width)
+        start_y = min(max(int(round(start_y)), 0), self.height)
+        end_y = min(max(int(round(end_y)), 0), self.height)
+
+        return start_x, start_y, end_x, end_y
+
+    def crop_rgb(self, start_x, start_y, end_x, end_y):
+        start_x, start_y, end_x, end_y = self.clip_bbox(start_x, start_y, end_x, end_y)
+
+        region = self.pixels[start_y:end_y, start_x:end_x]
+
+        if self.channel_order == "RGB":
+            return region
+
+        return cv2.cvtColor(region, _to_rgb[self.channel_order])
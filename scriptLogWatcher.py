@@ -0,0 +1,117 @@
+import os
+import threading
+import time
+
+# Watches the Script.log written by the dt192 plugin. The plugin logs the name of the new
+# target as soon as it changes, which is right before a quest dialog opens. Every new line
+# wakes up the monitor loop, so it does not have to poll the screen blindly at a high rate.
+#
+# The file is checked with os.stat, which costs next to nothing and works the same on
+# Windows and Linux. Only the bytes appended since the last check are read.
+# A last line without a line break (yet) counts as the current line, like readlines()[-1].
+
+
+class ScriptLogWatcher:
+    def __init__(self, path, poll_interval=0.05):
+        self.path = path
+        self.poll_interval = poll_interval
+        self.last_line = None
+        self.triggers = 0
+
+        self._event = threading.Event()
+        self._position = None
+        self._partial = ""
+        # Unterminated line that already woke up the loop, its line break must not do it again
+        self._announced = None
+        self._thread = None
+        self._stop = threading.Event()
+
+    @property
+    def available(self):
+        return self._position is not None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="script-log-watcher", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def wait(self, timeout):
+        """ Sleeps up to `timeout` seconds, returns True when a new line woke it up earlier. """
+        triggered = self._event.wait(timeout)
+        self._event.clear()
+        return triggered
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self._check()
+            except OSError:
+                self._position = None
+
+            time.sleep(self.poll_interval)
+
+    def _check(self):
+        try:
+            size = os.stat(self.path).st_size
+        except FileNotFoundError:
+            self._position = None
+            return
+
+        if self._position is None:
+            # Erster Blick auf die Datei: alte Einträge nicht als neuen Dialog werten
+            self.last_line, self._partial = self._read_tail(size)
+            self._announced = self._partial.strip() or None
+            self._position = size
+            return
+
+        if size < self._position:
+            # Neue Spielsitzung, die Datei wurde neu angelegt
+            self._position = 0
+            self._partial = ""
+            self._announced = None
+
+        if size == self._position:
+            return
+
+        with open(self.path, "rb") as file:
+            file.seek(self._position)
+            data = file.read(size - self._position)
+
+        self._position += len(data)
+
+        lines = (self._partial + data.decode("utf-8", errors="ignore")).split("\n")
+        self._partial = lines.pop()
+
+        lines = [line.strip() for line in lines if line.strip()]
+        partial = self._partial.strip()
+
+        if partial:
+            lines.append(partial)
+
+        if not lines:
+            return
+
+        self.last_line = lines[-1]
+
+        if lines == [self._announced]:
+            # Only the line break of a line that was already reported
+            self._announced = None
+            return
+
+        self._announced = partial or None
+        self.triggers += 1
+        self._event.set()
+
+    def _read_tail(self, size):
+        """ (last non-empty line, unterminated rest after the last line break) of the end of the file. """
+        with open(self.path, "rb") as file:
+            file.seek(max(0, size - 4096))
+            data = file.read().decode("utf-8", errors="ignore")
+
+        lines = [line.strip() for line in data.split("\n") if line.strip()]
+        partial = data.rsplit("\n", 1)[-1] if "\n" in data or size <= 4096 else ""
+
+        return (lines[-1] if lines else None), partial
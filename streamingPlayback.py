@@ -0,0 +1,248 @@
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pygame
+
+# Streaming playback for long quest texts. The text is split into sentence chunks, the chunks
+# are synthesized in parallel and played in order on one mixer channel. While a chunk plays,
+# the next one is already queued (Channel.queue), so there is no gap between them.
+# The first chunk is kept short: the time until the first audio is about one sentence.
+
+# The first chunk ends after the first sentence (or at this length)
+first_chunk_chars = 160
+
+# Later chunks collect sentences up to this length, fewer requests and a natural sentence melody
+chunk_chars = 400
+
+# Shorter chunks ("Hail!") are joined with the next one, a request per word sounds choppy
+min_chunk_chars = 20
+
+# Parallel synthesis requests (ElevenLabs limits concurrent requests per account)
+max_workers = 3
+
+# A period after these words (lower case, without the period) does not end a sentence
+abbreviations = {
+    "mr", "mrs", "ms", "dr", "st", "mt", "jr", "sr", "vs", "etc", "e.g", "i.e",
+    "hr", "fr", "frl", "nr", "bzw", "usw", "ca", "z.b", "d.h", "u.a", "vgl", "str",
+    "mme", "mlle", "mgr", "cf",
+}
+
+# End of a sentence, group 1 is the whitespace after it: a closing quote stays with its sentence,
+# also the French one after a space ("Allez ! »")
+_sentence_end = re.compile(r"[.!?…](?:[\"'»«”]|[ \u00a0]»)?(\s+)")
+_clause_end = re.compile(r"(?<=[,;:])\s+")
+
+
+def split_long(sentence, limit):
+    """ Splits a sentence longer than limit at commas, as a last resort at spaces. """
+    if len(sentence) <= limit:
+        return [sentence]
+
+    parts = []
+    current = ""
+
+    for piece in _clause_end.split(sentence):
+        words = [piece] if len(piece) <= limit else piece.split()
+
+        for word in words:
+            if current and len(current) + 1 + len(word) > limit:
+                parts.append(current)
+                current = word
+            else:
+                current = f"{current} {word}" if current else word
+
+    if current:
+        parts.append(current)
+
+    return parts
+
+
+def ends_with_abbreviation(sentence):
+    """ "Mr.", "z.B." or an initial like "J." at the end: the period does not end the sentence. """
+    if not sentence.endswith("."):
+        return False
+
+    word = sentence.rsplit(None, 1)[-1][:-1]
+
+    return word.lower() in abbreviations or (len(word) == 1 and word.isupper())
+
+
+def split_sentences(text):
+    sentences = []
+
+    text = text.strip()
+    matches = list(_sentence_end.finditer(text))
+    starts = [0] + [match.end(1) for match in matches]
+    ends = [match.start(1) for match in matches] + [len(text)]
+
+    for start, end in zip(starts, ends):
+        sentence = text[start:end].strip()
+
+        if not sentence:
+            continue
+
+        if sentences and ends_with_abbreviation(sentences[-1]):
+            sentences[-1] = f"{sentences[-1]} {sentence}"
+        else:
+            sentences.append(sentence)
+
+    return sentences
+
+
+def merge_short(chunks, minimum=min_chunk_chars, first_limit=first_chunk_chars):
+    """
+    Joins chunks shorter than minimum with the next one (the last one with the previous one).
+    The first chunk stays short: it is only joined while the result fits into first_limit.
+    """
+    merged = []
+    pending = ""
+
+    for chunk in chunks:
+        if pending:
+            if merged or len(pending) + 1 + len(chunk) <= first_limit:
+                chunk = f"{pending} {chunk}"
+            else:
+                merged.append(pending)
+
+        pending = ""
+
+        if len(chunk) < minimum:
+            pending = chunk
+        else:
+            merged.append(chunk)
+
+    if pending:
+        if merged:
+            merged[-1] = f"{merged[-1]} {pending}"
+        else:
+            merged.append(pending)
+
+    return merged
+
+
+def split_chunks(text, first_limit=first_chunk_chars, limit=chunk_chars):
+    """ Short first chunk, then sentences joined up to limit. The same text always gives the same chunks. """
+    sentences = split_sentences(text)
+
+    chunks = []
+    current = ""
+
+    for sentence in sentences:
+        current_limit = first_limit if not chunks else limit
+
+        for part in split_long(sentence, current_limit):
+            if not chunks and not current:
+                # First chunk: one sentence only, played as soon as possible
+                chunks.append(part)
+                continue
+
+            if current and len(current) + 1 + len(part) > limit:
+                chunks.append(current)
+                current = part
+            else:
+                current = f"{current} {part}" if current else part
+
+    if current:
+        chunks.append(current)
+
+    return merge_short(chunks, first_limit=first_limit)
+
+
+class ChunkPlayer:
+    """ Plays audio files in order and without gaps, each one queued while the previous one plays. """
+
+    def __init__(self):
+        self.channel = None
+        self.stopped = threading.Event()
+
+    def enqueue(self, path):
+        if self.stopped.is_set():
+            return False
+
+        sound = pygame.mixer.Sound(path)
+
+        if self.channel is None:
+            self.channel = sound.play()
+            return self.channel is not None
+
+        # A channel holds one queued sound, wait until the queued one has started playing
+        while self.channel.get_queue() is not None:
+            if self.stopped.is_set():
+                return False
+
+            time.sleep(0.01)
+
+        # Starts immediately if the previous chunk has already ended
+        self.channel.queue(sound)
+
+        return True
+
+    def wait(self):
+        while self.channel is not None and self.channel.get_busy() and not self.stopped.is_set():
+            time.sleep(0.05)
+
+    def stop(self):
+        self.stopped.set()
+
+        if self.channel is not None:
+            self.channel.stop()
+
+
+_current_player = None
+_player_lock = threading.Lock()
+
+
+def stop():
+    """ Stops the chunk playback that is currently running (hotkey). """
+    with _player_lock:
+        if _current_player is not None:
+            _current_player.stop()
+
+
+def play_stream(chunks, synthesize, workers=max_workers):
+    """
+    synthesize(chunk) returns the path of an audio file (from the cache or newly generated) or None.
+    All chunks are submitted at once, the first one first; playback starts as soon as it is ready.
+    Returns False if a chunk could not be synthesized.
+    """
+    global _current_player
+
+    if not pygame.mixer.get_init():
+        pygame.mixer.init()
+
+    player = ChunkPlayer()
+
+    with _player_lock:
+        if _current_player is not None:
+            _current_player.stop()
+
+        _current_player = player
+
+    complete = True
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        futures = [executor.submit(synthesize, chunk) for chunk in chunks]
+
+        try:
+            for future in futures:
+                path = future.result()
+
+                if path is None:
+                    complete = False
+                    break
+
+                if not player.enqueue(path):
+                    break
+
+            player.wait()
+        finally:
+            # Chunks that are not needed any more (stop or error) are not requested
+            for future in futures:
+                future.cancel()
+
+    with _player_lock:
+        if _current_player is player:
+            _current_player = None
+
+    return complete
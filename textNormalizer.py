@@ -0,0 +1,133 @@
+import os
+import re
+import threading
+
+# Text cleanup shared by both OCR paths. The replacement rules (replace_string.txt plus built-in
+# rules) are compiled into a single regular expression, so every OCR result is scanned once
+# instead of once per rule, and the file is only parsed again when its modification time changes.
+# The character whitelist is applied with str.translate (ASCII text, the common case) or one
+# character class regex (text with accents, where a translate table is slower in CPython).
+
+# Characters kept by the legacy cleanup (see cleanText.clear).
+default_whitelist = ("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789!?.;,:-'\" "
+                     "äöüßàâçéèêëîïôûùÿæœÀÂÇÉÈÊËÎÏÔÛÙÜŸÆŒ")
+
+
+class WhitelistTable(dict):
+    """ str.translate table that deletes every character not in the whitelist. """
+
+    def __init__(self, allowed):
+        super().__init__()
+        self.allowed = frozenset(allowed)
+
+    def __missing__(self, code):
+        # Each character is decided once, then translate finds it in the dict
+        value = code if chr(code) in self.allowed else None
+        self[code] = value
+        return value
+
+
+def parse_rules(path):
+    """ One rule per line: old,new  ("" as new removes the text). """
+    rules = {}
+
+    with open(path, "r", encoding="utf-8") as file:
+        for line in file:
+            parts = line.strip().split(",")
+
+            if len(parts) == 2:
+                old_str, new_str = parts[0], parts[1]
+
+                if new_str == '""':
+                    new_str = ""
+
+                if old_str:
+                    rules[old_str] = new_str
+
+    return rules
+
+
+def compile_rules(rules):
+    if not rules:
+        return None
+
+    # Longest first, so "NYZ B" wins over a shorter rule starting at the same position
+    keys = sorted(rules, key=len, reverse=True)
+
+    return re.compile("|".join(re.escape(key) for key in keys))
+
+
+class TextNormalizer:
+    def __init__(self, rules_path=None, builtin_rules=None, whitelist=default_whitelist):
+        self.rules_path = rules_path
+        self.builtin_rules = dict(builtin_rules or {})
+        self.table = WhitelistTable(whitelist) if whitelist else None
+        self.removed = re.compile("[^" + re.escape(whitelist) + "]+") if whitelist else None
+
+        # (compiled pattern, rules) replaced together, so a reload never mixes old and new
+        self._compiled = (compile_rules(self.builtin_rules), dict(self.builtin_rules))
+        self._mtime = None
+        self._lock = threading.Lock()
+
+    def reload_if_changed(self):
+        if not self.rules_path:
+            return
+
+        try:
+            mtime = os.stat(self.rules_path).st_mtime_ns
+        except OSError:
+            mtime = None
+
+        if mtime == self._mtime:
+            return
+
+        with self._lock:
+            if mtime == self._mtime:
+                return
+
+            rules = dict(self.builtin_rules)
+
+            if mtime is not None:
+                try:
+                    rules.update(parse_rules(self.rules_path))
+                except (OSError, UnicodeDecodeError) as e:
+                    print(f"Could not read {self.rules_path}: {e}")
+
+            self._compiled = (compile_rules(rules), rules)
+            self._mtime = mtime
+
+    def replace(self, text):
+        self.reload_if_changed()
+
+        pattern, rules = self._compiled
+
+        if pattern is None:
+            return text
+
+        return pattern.sub(lambda match: rules[match.group(0)], text)
+
+    def collapse_whitespace(self, text):
+        """ Same result as re.sub(r"\s+", " ", text), but without a Python call per space. """
+        collapsed = " ".join(text.split())
+
+        if text[:1].isspace():
+            collapsed = " " + collapsed
+        if text[-1:].isspace() and collapsed != " ":
+            collapsed += " "
+
+        return collapsed
+
+    def filter_characters(self, text):
+        if self.table is None:
+            return text
+
+        if text.isascii():
+            return text.translate(self.table)
+
+        return self.removed.sub("", text)
+
+    def normalize(self, text):
+        text = self.replace(text.replace("\n", " "))
+        text = self.collapse_whitespace(text)
+
+        return self.filter_characters(text)